@@ -1,10 +1,19 @@
-from typing import Optional, Dict, Any, List
+from typing import Any, AsyncIterator, Dict, Optional
+import asyncio
+import json
 import os
 
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, HttpUrl
 
-from app.services.parser import parse_python_project
+from app.services.parser import iter_parse_python_project
+
+try:
+    # Optional fast JSON codec (see app/services/ai.py)
+    import orjson
+except Exception:
+    orjson = None  # type: ignore[assignment]
 
 router = APIRouter()
 
@@ -16,14 +25,6 @@ class GenerateRequest(BaseModel):
     local_path: Optional[str] = None
 
 
-class GenerateResponse(BaseModel):
-    task_id: str
-    status: str
-    message: Optional[str] = None
-    target_dir: str
-    summary: Dict[str, Any]
-
-
 def _resolve_target_dir(local_path: Optional[str]) -> str:
     """
     Minimal working path resolution:
@@ -39,51 +40,83 @@ def _resolve_target_dir(local_path: Optional[str]) -> str:
     return os.getcwd()
 
 
-def _summarize(docs) -> Dict[str, Any]:
-    modules = len(docs)
-    classes = sum(len(m.classes) for m in docs)
-    functions = sum(len(m.functions) for m in docs)
-    methods = sum(len(c.methods) for m in docs for c in m.classes)
-    missing_module_docs = sum(1 for m in docs if not m.docstring)
-    missing_function_docs = sum(1 for m in docs for f in m.functions if not f.docstring)
-    missing_method_docs = sum(
-        1 for m in docs for c in m.classes for f in c.methods if not f.docstring
-    )
-    top_modules: List[Dict[str, Any]] = [
-        {
-            "module": m.module,
-            "path": m.path,
-            "classes": len(m.classes),
-            "functions": len(m.functions),
-            "has_doc": bool(m.docstring),
-        }
-        for m in docs[:10]
-    ]
-    return {
-        "modules": modules,
-        "classes": classes,
-        "functions": functions,
-        "methods": methods,
-        "missing_module_docs": missing_module_docs,
-        "missing_function_docs": missing_function_docs,
-        "missing_method_docs": missing_method_docs,
-        "top_modules": top_modules,
-    }
-
-
-@router.post("/generate", response_model=GenerateResponse, tags=["generate"])
-async def generate_docs(payload: GenerateRequest) -> GenerateResponse:
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+@router.post("/generate", tags=["generate"])
+async def generate_docs(payload: GenerateRequest) -> StreamingResponse:
+    """
+    Stream per-module NDJSON rows followed by a final summary row.
+
+    Modules are parsed and emitted one at a time so peak memory stays
+    O(1) in module count; counters accumulate inline and each ModuleDoc
+    is dropped as soon as its row is sent.
+    """
     target_dir = _resolve_target_dir(payload.local_path)
-    docs = parse_python_project(target_dir)
-    summary = _summarize(docs)
-
-    return GenerateResponse(
-        task_id="stub-parse-local-001",
-        status="completed",
-        message=(
-            "Parsed local directory successfully. Git cloning based on repo_url "
-            "is not implemented yet in this minimal flow."
-        ),
-        target_dir=target_dir,
-        summary=summary,
-    )
\ No newline at end of file
+
+    async def _rows() -> AsyncIterator[bytes]:
+        modules = 0
+        classes = 0
+        functions = 0
+        methods = 0
+        missing_module_docs = 0
+        missing_function_docs = 0
+        missing_method_docs = 0
+
+        it = iter_parse_python_project(target_dir)
+        sentinel = object()
+        while True:
+            # next() does blocking parse work; keep it off the event loop
+            m = await asyncio.to_thread(next, it, sentinel)
+            if m is sentinel:
+                break
+
+            modules += 1
+            classes += len(m.classes)
+            functions += len(m.functions)
+            if not m.docstring:
+                missing_module_docs += 1
+            for f in m.functions:
+                if not f.docstring:
+                    missing_function_docs += 1
+            for c in m.classes:
+                methods += len(c.methods)
+                for f in c.methods:
+                    if not f.docstring:
+                        missing_method_docs += 1
+
+            row = {
+                "type": "module",
+                "module": m.module,
+                "path": m.path,
+                "classes": len(m.classes),
+                "functions": len(m.functions),
+                "has_doc": bool(m.docstring),
+            }
+            yield _dumps(row) + b"\n"
+
+        summary = {
+            "type": "summary",
+            "task_id": "stub-parse-local-001",
+            "status": "completed",
+            "message": (
+                "Parsed local directory successfully. Git cloning based on repo_url "
+                "is not implemented yet in this minimal flow."
+            ),
+            "target_dir": target_dir,
+            "summary": {
+                "modules": modules,
+                "classes": classes,
+                "functions": functions,
+                "methods": methods,
+                "missing_module_docs": missing_module_docs,
+                "missing_function_docs": missing_function_docs,
+                "missing_method_docs": missing_method_docs,
+            },
+        }
+        yield _dumps(summary) + b"\n"
+
+    return StreamingResponse(_rows(), media_type="application/x-ndjson")
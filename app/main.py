@@ -1,11 +1,29 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Defer the v1 router import to startup: it pulls the full parser
+    # dependency graph, which slows cold start when imported eagerly.
+    from app.api.v1.generate import router as v1_generate_router
+
+    app.include_router(v1_generate_router, prefix="/api/v1")
+    yield
+    # Release the pooled AI HTTP client on shutdown
+    from app.services.ai import close_http_client
+
+    close_http_client()
+
+
 app = FastAPI(
     title="AI Code Documentation Generator",
     version="0.1.0",
     docs_url="/api/docs",
     openapi_url="/api/openapi.json",
+    lifespan=lifespan,
 )
 
 # Enable CORS for frontend development
@@ -23,11 +41,6 @@ async def health():
     return {"status": "ok"}
 
 
-# Mount API v1 routers
-from app.api.v1.generate import router as v1_generate_router
-app.include_router(v1_generate_router, prefix="/api/v1")
-
-
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,13 +1,159 @@
 from __future__ import annotations
 
+import functools
+import hashlib
 import json
 import os
-import ssl
-import urllib.error
-import urllib.request
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+try:
+    # Optional pooled HTTP client: reuses one TCP/TLS session across calls.
+    import httpx
+except Exception:
+    httpx = None  # type: ignore[assignment]
+
+try:
+    # Optional fast JSON codec: parses/serializes bytes directly in C.
+    import orjson
+except Exception:
+    orjson = None  # type: ignore[assignment]
+
+
+def _json_dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    # stdlib json accepts bytes directly; no intermediate str needed
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=1)
+def _ssl_context() -> "ssl.SSLContext":
+    """
+    Build the default SSL context once per process (loads the system
+    trust store, which costs tens of ms per call). The import is
+    deferred to first use to keep module import light.
+    """
+    import ssl
+
+    return ssl.create_default_context()
+
+
+# On-disk response cache: docstring generation is pure in its inputs,
+# so repeat scans (CI reruns, incremental mode) can skip the network.
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_DOC_CACHE_DIR = os.path.join(_PROJECT_ROOT, "runtime", "docgen_cache", "doc")
+# Bump to invalidate cached responses after prompt-template changes
+_DOC_CACHE_VERSION = "1"
+
+
+def _doc_cache_key(*parts: str) -> str:
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(p.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def _doc_cache_get(key: str) -> Optional[str]:
+    try:
+        with open(os.path.join(_DOC_CACHE_DIR, f"{key}.txt"), "r", encoding="utf-8") as f:
+            return f.read()
+    except Exception:
+        return None
+
+
+def _doc_cache_put(key: str, content: str) -> None:
+    try:
+        os.makedirs(_DOC_CACHE_DIR, exist_ok=True)
+        path = os.path.join(_DOC_CACHE_DIR, f"{key}.txt")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except Exception:
+        # Cache persistence is best-effort only
+        pass
+
+
+def _style_hint(style: str) -> str:
+    s = (style or "google").lower()
+    if s in ("google", "google-style", "google docstring"):
+        return "Google style"
+    if s in ("numpy", "numpydoc", "numpy-style"):
+        return "NumPy style"
+    if s in ("rst", "restructuredtext", "sphinx"):
+        return "reStructuredText (Sphinx) style"
+    if s in ("pep257", "pep-257"):
+        return "PEP 257 compliant style"
+    return "Google style"
+
+
+# Static user-message templates (rendered per call via .format)
+_GENERATE_USER_TEMPLATE = """Function Signature:
+```
+{signature}
+```
+
+Implementation Code:
+```python
+{code}
+```
+"""
+
+_IMPROVE_USER_TEMPLATE = """Existing Docstring:
+```
+{existing_docstring}
+```
+
+Associated Implementation Code (for context):
+```python
+{code}
+```
+"""
+
+
+@functools.lru_cache(maxsize=16)
+def _sys_prompt(style: str, language: str, mode: str) -> str:
+    """
+    Render (and cache) the system prompt for a (style, language, mode)
+    combination; the text is immutable so there is no point rebuilding
+    it per call.
+    """
+    style_hint = _style_hint(style)
+    if mode == "improve":
+        prompt = (
+            "You are an expert Python documentation reviewer. "
+            f"Rewrite and improve the given docstring to conform to {style_hint}. "
+            "Ensure clarity, completeness, parameter/return/raises coverage, and consistent formatting. "
+            "Output only the improved docstring content."
+        )
+        if language == "zh":
+            prompt += " 请使用专业、清晰的中文撰写文档字符串。"
+        else:
+            prompt += " Write in clear and professional English."
+        return prompt
+
+    prompt = (
+        "You are an expert Python documentation writer. "
+        "Given a function signature and its implementation code, "
+        f"produce a complete {style_hint} docstring. "
+        "Include a concise summary, detailed parameter descriptions, return value, "
+        "raises (if applicable), examples (optional). "
+        "Do not include the function definition itself; only output the docstring content. "
+    )
+    if language == "zh":
+        prompt += "请使用专业、清晰的中文撰写文档字符串。"
+    else:
+        prompt += "Write in clear and professional English."
+    return prompt
+
 
 """
 AIService for Tencent Hunyuan (OpenAI-compatible endpoint)
@@ -17,11 +163,36 @@ Configuration via environment variables:
 - HUNYUAN_API_KEY:     API key for Authorization: Bearer <key>
 - HUNYUAN_MODEL:       Default model name, e.g. hunyuan-lite or hunyuan-pro (default: hunyuan-lite)
 
-No extra third-party dependency is required (uses urllib from stdlib).
+Uses a pooled httpx client (keep-alive) when available; falls back to urllib
+from stdlib so the service keeps working without third-party packages.
 If your endpoint strictly follows OpenAI chat-completions API, this will work out-of-the-box.
 """
 
 
+# Shared connection pool: one TLS handshake amortized over all chat calls.
+_http_client: Optional["httpx.Client"] = None
+
+
+def _get_http_client(timeout: int) -> "httpx.Client":
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=timeout,
+        )
+    return _http_client
+
+
+def close_http_client() -> None:
+    """
+    Close the shared HTTP connection pool (e.g. on app shutdown).
+    """
+    global _http_client
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
+
+
 @dataclass
 class AIServiceConfig:
     base_url: str
@@ -30,6 +201,7 @@ class AIServiceConfig:
     timeout: int = 60
 
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def from_env() -> "AIServiceConfig":
         base = os.getenv("HUNYUAN_OPENAI_BASE", "").strip()
         key = os.getenv("HUNYUAN_API_KEY", "").strip()
@@ -69,15 +241,49 @@ class AIService:
         if max_tokens is not None:
             payload["max_tokens"] = max_tokens
 
-        data = json.dumps(payload).encode("utf-8")
+        if httpx is not None:
+            obj = self._post_httpx(url, headers, payload)
+        else:
+            obj = self._post_urllib(url, headers, payload)
+
+        # OpenAI-compatible: choices[0].message.content
+        try:
+            return obj["choices"][0]["message"]["content"]
+        except Exception as e:
+            raise RuntimeError(f"AIService unexpected response schema: {obj}") from e
+
+    def _post_httpx(self, url: str, headers: Dict[str, str], payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST via the shared pooled httpx client (keep-alive across calls).
+        """
+        client = _get_http_client(self.cfg.timeout)
+        try:
+            resp = client.post(url, content=_json_dumps(payload), headers=headers, timeout=self.cfg.timeout)
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"AIService HTTP error: {type(e).__name__}: {e}") from e
+        if resp.status_code >= 400:
+            raise RuntimeError(f"AIService HTTPError {resp.status_code}: {resp.text}")
+        try:
+            return _json_loads(resp.content)
+        except Exception as e:
+            raise RuntimeError(f"AIService invalid JSON response: {e}") from e
+
+    def _post_urllib(self, url: str, headers: Dict[str, str], payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fallback POST via urllib (no pooling) when httpx is unavailable.
+        Imports are deferred: this path only runs without httpx.
+        """
+        import urllib.error
+        import urllib.request
+
+        data = _json_dumps(payload)
         req = urllib.request.Request(url, data=data, headers=headers, method="POST")
 
-        # Allow SSL default context (safer) and configurable timeout
-        ctx = ssl.create_default_context()
+        # Shared default SSL context (loading the trust store is expensive)
+        ctx = _ssl_context()
         try:
             with urllib.request.urlopen(req, timeout=self.cfg.timeout, context=ctx) as resp:
-                body = resp.read().decode("utf-8")
-                obj = json.loads(body)
+                return _json_loads(resp.read())
         except urllib.error.HTTPError as e:
             detail = e.read().decode("utf-8", errors="ignore") if hasattr(e, "read") else ""
             raise RuntimeError(f"AIService HTTPError {e.code}: {detail}") from e
@@ -86,25 +292,6 @@ class AIService:
         except Exception as e:
             raise RuntimeError(f"AIService unexpected error: {type(e).__name__}: {e}") from e
 
-        # OpenAI-compatible: choices[0].message.content
-        try:
-            return obj["choices"][0]["message"]["content"]
-        except Exception as e:
-            raise RuntimeError(f"AIService unexpected response schema: {obj}") from e
-
-    @staticmethod
-    def _style_hint(style: str) -> str:
-        s = (style or "google").lower()
-        if s in ("google", "google-style", "google docstring"):
-            return "Google style"
-        if s in ("numpy", "numpydoc", "numpy-style"):
-            return "NumPy style"
-        if s in ("rst", "restructuredtext", "sphinx"):
-            return "reStructuredText (Sphinx) style"
-        if s in ("pep257", "pep-257"):
-            return "PEP 257 compliant style"
-        return "Google style"
-
     def generate_docstring(
         self,
         code: str,
@@ -117,36 +304,20 @@ class AIService:
         - style: google | numpy | rst | pep257
         - language: 'en' or 'zh' (docstring language preference)
         """
-        style_hint = self._style_hint(style)
-        sys_prompt = (
-            "You are an expert Python documentation writer. "
-            "Given a function signature and its implementation code, "
-            f"produce a complete {style_hint} docstring. "
-            "Include a concise summary, detailed parameter descriptions, return value, "
-            "raises (if applicable), examples (optional). "
-            "Do not include the function definition itself; only output the docstring content. "
-        )
-        if language == "zh":
-            sys_prompt += "请使用专业、清晰的中文撰写文档字符串。"
-        else:
-            sys_prompt += "Write in clear and professional English."
-
-        user_msg = f"""Function Signature:
-```
-{signature}
-```
+        key = _doc_cache_key(_DOC_CACHE_VERSION, "generate", self.cfg.model, style, language, signature, code)
+        cached = _doc_cache_get(key)
+        if cached is not None:
+            return cached
 
-Implementation Code:
-```python
-{code}
-```
-"""
+        sys_prompt = _sys_prompt(style, language, "generate")
+        user_msg = _GENERATE_USER_TEMPLATE.format(signature=signature, code=code)
 
         content = self._chat(
             messages=[{"role": "system", "content": sys_prompt}, {"role": "user", "content": user_msg}],
             temperature=0.2,
-        )
-        return content.strip()
+        ).strip()
+        _doc_cache_put(key, content)
+        return content
 
     def improve_docstring(
         self,
@@ -158,34 +329,20 @@ Implementation Code:
         """
         Improve an existing docstring to match target style and enhance clarity/completeness.
         """
-        style_hint = self._style_hint(style)
-        sys_prompt = (
-            "You are an expert Python documentation reviewer. "
-            f"Rewrite and improve the given docstring to conform to {style_hint}. "
-            "Ensure clarity, completeness, parameter/return/raises coverage, and consistent formatting. "
-            "Output only the improved docstring content."
-        )
-        if language == "zh":
-            sys_prompt += " 请使用专业、清晰的中文撰写文档字符串。"
-        else:
-            sys_prompt += " Write in clear and professional English."
+        key = _doc_cache_key(_DOC_CACHE_VERSION, "improve", self.cfg.model, style, language, existing_docstring, code)
+        cached = _doc_cache_get(key)
+        if cached is not None:
+            return cached
 
-        user_msg = f"""Existing Docstring:
-```
-{existing_docstring}
-```
-
-Associated Implementation Code (for context):
-```python
-{code}
-```
-"""
+        sys_prompt = _sys_prompt(style, language, "improve")
+        user_msg = _IMPROVE_USER_TEMPLATE.format(existing_docstring=existing_docstring, code=code)
 
         content = self._chat(
             messages=[{"role": "system", "content": sys_prompt}, {"role": "user", "content": user_msg}],
             temperature=0.2,
-        )
-        return content.strip()
+        ).strip()
+        _doc_cache_put(key, content)
+        return content
 
 
 class LocalDocService:
@@ -238,9 +395,11 @@ class LocalDocService:
             lines.append("    >>> # Example: add a realistic usage example")
         return "\n".join(lines)
 
+@functools.lru_cache(maxsize=1)
 def get_ai_service():
     """
-    获取AI服务实例；若未配置远程AI（环境变量缺失）则回退到本地生成器。
+    获取AI服务实例（进程内缓存，重复调用复用同一实例）；
+    若未配置远程AI（环境变量缺失）则回退到本地生成器。
     环境变量:
       - HUNYUAN_OPENAI_BASE
       - HUNYUAN_API_KEY
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import ast
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from typing import Optional, Tuple
+
+
+"""
+Persistent source/AST cache backed by SQLite.
+
+Stores (path, sha256(bytes)) -> (source, pickled ast.Module, mtime) in
+runtime/ast_cache.sqlite so repeated parses of unchanged files are
+served from disk instead of re-running ast.parse — both within a run
+and across runs.
+
+Lookup order per file:
+  1) mtime fast path: if the stored mtime for the path matches, reuse
+     the cached source + tree without reading or hashing the file;
+  2) content hash: read the file, compare sha256; on hit reuse the
+     cached tree and refresh the stored mtime;
+  3) miss: ast.parse and INSERT OR REPLACE.
+
+All failures fall back to a plain parse; the cache never breaks callers.
+"""
+
+_SERVER_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_DB_PATH = os.path.join(_SERVER_ROOT, "runtime", "ast_cache.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ast_cache (
+    path TEXT NOT NULL,
+    sha BLOB NOT NULL,
+    src BLOB NOT NULL,
+    tree BLOB NOT NULL,
+    mtime REAL NOT NULL,
+    PRIMARY KEY (path, sha)
+)
+"""
+
+# SQLite connections are not shareable across threads by default
+_local = threading.local()
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(_DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(_DB_PATH)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(_SCHEMA)
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def load_parsed(path: str) -> Tuple[bytes, ast.Module]:
+    """
+    Read and parse a source file, serving repeat requests from the
+    persistent cache.
+
+    Returns:
+        (source_bytes, ast.Module) — callers decode only the segments
+        they actually surface.
+    """
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime
+
+    conn: Optional[sqlite3.Connection]
+    try:
+        conn = _connect()
+    except Exception:
+        conn = None
+
+    # 1) mtime fast path: skip the file read entirely
+    if conn is not None:
+        try:
+            row = conn.execute(
+                "SELECT src, tree FROM ast_cache WHERE path = ? AND mtime = ? LIMIT 1",
+                (path, mtime),
+            ).fetchone()
+            if row is not None:
+                return row[0], pickle.loads(row[1])
+        except Exception:
+            pass
+
+    with open(path, "rb") as f:
+        data = f.read()
+    sha = hashlib.sha256(data).digest()
+
+    # 2) content-hash hit (e.g. file touched but unchanged)
+    if conn is not None:
+        try:
+            row = conn.execute(
+                "SELECT tree FROM ast_cache WHERE path = ? AND sha = ?", (path, sha)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE ast_cache SET mtime = ? WHERE path = ? AND sha = ?",
+                    (mtime, path, sha),
+                )
+                conn.commit()
+                return data, pickle.loads(row[0])
+        except Exception:
+            pass
+
+    # 3) miss: parse and persist (ast.parse decodes bytes itself)
+    tree = ast.parse(data, filename=path)
+    if conn is not None:
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO ast_cache (path, sha, src, tree, mtime) VALUES (?, ?, ?, ?, ?)",
+                (path, sha, data, pickle.dumps(tree, protocol=5), mtime),
+            )
+            conn.commit()
+        except Exception:
+            pass
+    return data, tree
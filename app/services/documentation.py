@@ -1,59 +1,122 @@
 from __future__ import annotations
 
+import functools
 import os
 import ast
+import re
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
-from app.services.parser import ModuleDoc, ClassDoc, FunctionDoc, parse_python_project
+from app.services import ast_cache
+from app.services.parser import ModuleDoc, ClassDoc, FunctionDoc, iter_parse_python_project
 from app.services.ai import get_ai_service
 
-# Server root (project root) -> runtime/logs
+# Server root (project root) -> runtime/logs; the directory is created
+# lazily on first log open, not at import time
 _SERVER_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
 _LOG_DIR = os.path.join(_SERVER_ROOT, "runtime", "logs")
-os.makedirs(_LOG_DIR, exist_ok=True)
+
+@functools.lru_cache(maxsize=512)
+def _load_parsed(path: str, mtime_ns: int) -> Tuple[List[bytes], ast.Module]:
+    """
+    Read and parse a source file once per (path, mtime).
+
+    Returns (source_byte_lines, ast_module). Backed by the persistent
+    SQLite cache in app.services.ast_cache, so unchanged files skip
+    ast.parse across runs; edits change the mtime key, invalidating
+    this layer. Lines stay as bytes; only surfaced segments decode.
+    """
+    src, mod = ast_cache.load_parsed(path)
+    return src.splitlines(keepends=True), mod
+
+
+def _load_parsed_now(path: str) -> Tuple[List[bytes], ast.Module]:
+    """
+    Convenience wrapper keyed on the file's current mtime.
+    """
+    return _load_parsed(path, os.stat(path).st_mtime_ns)
+
+
+@dataclass(slots=True)
+class DocResult:
+    """
+    One generated-docstring row; kept as a slots dataclass so large runs
+    don't pay per-row dict overhead. Serialized at the API boundary via
+    to_dict().
+    """
+    module: str
+    path: str
+    cls: Optional[str]
+    function: str
+    lineno: int
+    signature: str
+    generated_docstring: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "module": self.module,
+            "path": self.path,
+            "class": self.cls,
+            "function": self.function,
+            "lineno": self.lineno,
+            "signature": self.signature,
+            "generated_docstring": self.generated_docstring,
+        }
 
 
 def _now() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
-def _open_log_file(prefix: str = "docgen") -> str:
+def _open_log_file(prefix: str = "docgen") -> Tuple[str, Any]:
+    """
+    Open the run log once, line-buffered, and return (path, handle).
+    The handle stays open for the whole invocation instead of paying
+    open/close syscalls per log line.
+    """
+    os.makedirs(_LOG_DIR, exist_ok=True)
     ts = datetime.now().strftime("%Y%m%d-%H%M%S")
     path = os.path.join(_LOG_DIR, f"{prefix}-{ts}.log")
-    # touch file
-    with open(path, "a", encoding="utf-8") as _:
-        pass
-    return path
+    return path, open(path, "a", encoding="utf-8", buffering=1)
 
 
-def _append_log(log_path: str, message: str) -> None:
+def _append_log(log_fh: Any, message: str) -> None:
     try:
-        with open(log_path, "a", encoding="utf-8") as f:
-            f.write(f"[{_now()}] {message}\n")
+        log_fh.write(f"[{_now()}] {message}\n")
     except Exception:
         # do not break main flow
         pass
 
 
+@functools.lru_cache(maxsize=None)
+def _skip_imports_regex(modules: Tuple[str, ...]) -> "re.Pattern[bytes]":
+    """
+    Compile one line-anchored alternation matching 'import X' / 'from X'
+    for all skip modules, so each file is scanned exactly once. Bytes
+    mode, matching the raw file reads.
+    """
+    alt = "|".join(re.escape(m) for m in modules)
+    pattern = rf"^[ \t]*(?:import|from)[ \t]+(?:{alt})(?:[ \t.,]|$)"
+    return re.compile(pattern.encode("utf-8"), re.MULTILINE)
+
+
 def _file_contains_imports(file_path: str, modules: List[str]) -> bool:
     """
-    Lightweight check: if file contains 'import X' or 'from X ' for any X in modules.
+    Lightweight check: whether the file imports any of `modules`
+    (line-anchored, so string literals mentioning them don't match).
+    Scans raw bytes; no decode of the full file.
     """
     if not modules:
         return False
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            txt = f.read()
+        with open(file_path, "rb") as f:
+            data = f.read()
     except Exception:
         return False
-    for m in modules:
-        key1 = f"import {m}"
-        key2 = f"from {m} "
-        if key1 in txt or key2 in txt:
-            return True
-    return False
+    return bool(_skip_imports_regex(tuple(modules)).search(data))
 
 
 def _build_signature(func: FunctionDoc) -> str:
@@ -75,111 +138,124 @@ def _build_signature(func: FunctionDoc) -> str:
     return f"{func.name}({params_str}){ret}"
 
 
-def _find_function_node(
-    file_path: str,
-    func_name: str,
-    func_lineno: int,
-    class_name: Optional[str] = None,
-    class_lineno: Optional[int] = None,
-) -> Optional[ast.AST]:
-    """
-    Re-parse a file to locate the AST node of a target function/method by name and lineno.
-    """
-    with open(file_path, "r", encoding="utf-8") as f:
-        src = f.read()
-    mod = ast.parse(src, filename=file_path)
-
-    if class_name is None:
-        for node in mod.body:
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                if node.name == func_name and getattr(node, "lineno", -1) == func_lineno:
-                    return node
-        return None
-
-    # Method within a class
-    for node in mod.body:
-        if isinstance(node, ast.ClassDef):
-            if node.name != class_name:
-                continue
-            if class_lineno is not None and getattr(node, "lineno", -1) != class_lineno:
-                continue
-            for b in node.body:
-                if isinstance(b, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    if b.name == func_name and getattr(b, "lineno", -1) == func_lineno:
-                        return b
-    return None
-
-
-def _extract_source_segment(file_path: str, node: ast.AST) -> str:
+def _extract_source_segment(lines: List[bytes], start: Optional[int], end: Optional[int]) -> str:
     """
-    Extract source code segment for a given AST node using lineno and end_lineno.
+    Extract a source segment from already-loaded byte lines using the
+    lineno/end_lineno refs captured at parse time. Only the returned
+    segment is decoded.
     """
-    start = getattr(node, "lineno", None)
-    end = getattr(node, "end_lineno", None)
     if start is None:
         return ""
-    with open(file_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
     if end is None:
         # Fallback: read only the starting line
-        return lines[start - 1].rstrip("\n")
-    return "".join(lines[start - 1 : end]).rstrip("\n")
+        return lines[start - 1].decode("utf-8", "replace").rstrip("\n")
+    return b"".join(lines[start - 1 : end]).decode("utf-8", "replace").rstrip("\n")
 
 
-def _insert_docstring_after_def(file_path: str, node: ast.AST, docstring: str) -> bool:
+def _line_offsets(src: bytes) -> List[int]:
     """
-    Insert a triple-quoted docstring as the first statement in a function/method body.
+    Byte offset of the start of each (1-based) line in `src`.
+    """
+    offsets = [0]
+    pos = src.find(b"\n")
+    while pos != -1:
+        offsets.append(pos + 1)
+        pos = src.find(b"\n", pos + 1)
+    return offsets
+
+
+def _line_indent(src: bytes, offsets: List[int], lineno: int) -> bytes:
+    start = offsets[lineno - 1]
+    end = start
+    while end < len(src) and src[end] in (0x20, 0x09):
+        end += 1
+    return src[start:end]
+
+
+def _docstring_block_bytes(
+    src: bytes,
+    offsets: List[int],
+    def_line: Optional[int],
+    first_body_line: Optional[int],
+    docstring: str,
+) -> Tuple[int, bytes]:
+    """
+    Build the triple-quoted docstring block for one insertion.
 
     Returns:
-        bool: True if written successfully, False otherwise.
+        (insert_at, block): byte offset to splice at and the encoded
+        block. Indentation is taken straight from the anchor line's
+        leading bytes — no full-file string materialization.
     """
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        def_line = getattr(node, "lineno", None)
-        # Prefer the first body statement line for correct indentation
-        body = getattr(node, "body", [])
-        first_body_line = None
-        if body:
-            first_body_line = getattr(body[0], "lineno", None)
-
-        # Compute insertion line (0-based index)
-        insert_at = (first_body_line - 1) if first_body_line else (def_line if def_line else 1)
-
-        # Derive indentation from the first body line; fallback to 4 spaces
-        indent_str = ""
-        if first_body_line:
-            raw = lines[first_body_line - 1]
-            indent_str = raw[: len(raw) - len(raw.lstrip())]
-        else:
-            # Fallback: use indentation from def line + 4 spaces
-            if def_line and def_line - 1 < len(lines):
-                def_raw = lines[def_line - 1]
-                base_indent = def_raw[: len(def_raw) - len(def_raw.lstrip())]
-                indent_str = base_indent + "    "
-            else:
-                indent_str = "    "
-
-        # Sanitize docstring delimiters
-        safe_doc = docstring.replace('"""', '\\"\\"\\"').rstrip()
+    nlines = len(offsets)
+    if first_body_line and first_body_line <= nlines:
+        ins_line = first_body_line
+        indent = _line_indent(src, offsets, first_body_line)
+    elif def_line and def_line < nlines:
+        # Fallback: line after the def, def-line indentation + 4 spaces
+        ins_line = def_line + 1
+        indent = _line_indent(src, offsets, def_line) + b"    "
+    else:
+        ins_line = min(2, nlines)
+        indent = b"    "
+    insert_at = offsets[ins_line - 1] if ins_line <= nlines else len(src)
+
+    # Sanitize docstring delimiters
+    safe_doc = docstring.replace('"""', '\\"\\"\\"').rstrip()
+
+    parts = [indent + b'"""' + b"\n"]
+    for ln in safe_doc.splitlines():
+        parts.append(indent + ln.rstrip().encode("utf-8") + b"\n")
+    parts.append(indent + b'"""' + b"\n")
+    parts.append(b"\n")  # ensure spacing after docstring
+
+    return insert_at, b"".join(parts)
+
+
+def _apply_docstring_inserts(
+    file_path: str,
+    inserts: List[Tuple[Optional[int], Optional[int], str]],
+    src: Optional[bytes] = None,
+) -> int:
+    """
+    Apply all docstring insertions for one file in a single
+    read-modify-write. `inserts` holds (def_line, first_body_line, doc)
+    tuples; blocks are spliced at byte offsets bottom-up so parse-time
+    positions stay valid, and the file is swapped in atomically via
+    os.replace. Working on bytes keeps memory at O(file + edits) with
+    no per-line str allocation.
 
-        block = []
-        block.append(f'{indent_str}"""')
-        if safe_doc:
-            for ln in safe_doc.splitlines():
-                block.append(f"{indent_str}{ln.rstrip()}")
-        block.append(f'{indent_str}"""')
-        block.append("\n")  # ensure spacing after docstring
+    Returns:
+        Number of insertions applied (0 on failure).
+    """
+    try:
+        if src is None:
+            with open(file_path, "rb") as f:
+                src = f.read()
+        offsets = _line_offsets(src)
+
+        applied = 0
+        out = src
+        for def_line, first_body_line, doc in sorted(
+            inserts, key=lambda t: t[1] if t[1] is not None else (t[0] or 0), reverse=True
+        ):
+            # Offsets are computed against the original source; splicing
+            # bottom-up keeps every earlier offset valid.
+            insert_at, block = _docstring_block_bytes(src, offsets, def_line, first_body_line, doc)
+            out = out[:insert_at] + block + out[insert_at:]
+            applied += 1
+
+        tmp = f"{file_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(out)
+        os.replace(tmp, file_path)
+        return applied
+    except Exception:
+        return 0
 
-        # Insert block
-        lines[insert_at:insert_at] = [l + ("\n" if not l.endswith("\n") else "") for l in block]
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.writelines(lines)
-        return True
-    except Exception:
-        return False
+# Default number of concurrent AI calls when batch_size is not given
+_DEFAULT_WORKERS = 8
 
 
 def _generate_for_function(
@@ -188,32 +264,26 @@ def _generate_for_function(
     style: str,
     language: str,
     class_ctx: Optional[Tuple[str, int]] = None,
+    ai: Optional[Any] = None,
 ) -> Dict[str, Any]:
     """
-    Generate docstring for a single function/method using AI and write it back to source.
+    Generate a docstring for a single function/method using AI.
+    Writing back to source happens afterwards, batched per file.
     """
-    node = _find_function_node(
-        file_path=file_path,
-        func_name=func.name,
-        func_lineno=func.lineno,
-        class_name=class_ctx[0] if class_ctx else None,
-        class_lineno=class_ctx[1] if class_ctx else None,
-    )
-    code = _extract_source_segment(file_path, node) if node else ""
+    # The parse-time refs on FunctionDoc give us the source segment and
+    # the insertion anchor directly; no per-target re-parse is needed.
+    lines, _ = _load_parsed(file_path, os.stat(file_path).st_mtime_ns)
+    code = _extract_source_segment(lines, func.lineno, func.end_lineno)
     signature = _build_signature(func)
-    ai = get_ai_service()
+    if ai is None:
+        ai = get_ai_service()
     doc = ai.generate_docstring(code=code, signature=signature, style=style, language=language)
 
-    written = False
-    if node is not None and doc:
-        written = _insert_docstring_after_def(file_path, node, doc)
-
     return {
         "signature": signature,
         "lineno": func.lineno,
         "generated_docstring": doc,
         "is_method": func.is_method,
-        "written": written,
     }
 
 
@@ -277,143 +347,163 @@ def generate_missing_docstrings(
     ]
     exclude_patterns = exclude_patterns if exclude_patterns is not None else default_exclude
     skip_imports = skip_imports if skip_imports is not None else default_skip_imports
-    # batch_size优先于max_items
-    if batch_size and not max_items:
-        max_items = batch_size
-
-    # parse with exclude
-    modules: List[ModuleDoc] = parse_python_project(target_dir, exclude_patterns=exclude_patterns)
-
-    # open log
-    log_path = _open_log_file(prefix="docgen")
-    _append_log(log_path, f"Start doc generation")
-    _append_log(log_path, f"target_dir={target_dir}")
-    _append_log(log_path, f"style={style}, language={language}, max_items={max_items}, dry_run={dry_run}")
-    _append_log(log_path, f"exclude_patterns={exclude_patterns}")
-    _append_log(log_path, f"skip_imports={skip_imports}")
-
-    scanned = 0
-    generated = 0
-    skipped = 0
-    errors = 0
-    results: List[Dict[str, Any]] = []
-
-    remaining = max_items if max_items is not None else float("inf")
-
-    for m in modules:
-        # Detect heavy imports once per module
-        mod_blocked = _file_contains_imports(m.path, skip_imports) if skip_imports else False
-        if mod_blocked:
-            _append_log(log_path, f"SKIP MODULE by imports: {m.path}")
-
-        # Top-level functions
-        for f in m.functions:
-            if remaining <= 0:
-                break
-            scanned += 1
-            if f.docstring:
-                skipped += 1
-                continue
-            # module-level skip by heavy imports
-            if mod_blocked:
-                skipped += 1
-                _append_log(log_path, f"SKIP FUNC (module blocked): {m.path}::{f.name}:{f.lineno}")
-                continue
-            if dry_run:
-                skipped += 1
-                _append_log(log_path, f"DRY RUN skip generate: {m.path}::{f.name}:{f.lineno}")
-                continue
-            try:
-                out = _generate_for_function(
-                    file_path=m.path,
-                    func=f,
-                    style=style,
-                    language=language,
-                    class_ctx=None,
-                )
-                results.append(
-                    {
-                        "module": m.module,
-                        "path": m.path,
-                        "class": None,
-                        "function": f.name,
-                        "lineno": out["lineno"],
-                        "signature": out["signature"],
-                        "generated_docstring": out["generated_docstring"],
-                    }
-                )
-                generated += 1
-                remaining -= 1
-                _append_log(log_path, f"GENERATED: {m.path}::{f.name}:{f.lineno}")
-            except Exception as e:
-                errors += 1
-                _append_log(log_path, f"ERROR GEN FUNC: {m.path}::{f.name}:{f.lineno} -> {type(e).__name__}: {e}")
-                _append_log(log_path, traceback.format_exc())
 
-        if remaining <= 0:
-            break
-
-        # Methods in classes
-        for c in m.classes:
-            for f in c.methods:
+    # open log once for the whole run; closed in the finally below
+    log_path, log_fh = _open_log_file(prefix="docgen")
+    try:
+        _append_log(log_fh, f"Start doc generation")
+        _append_log(log_fh, f"target_dir={target_dir}")
+        _append_log(log_fh, f"style={style}, language={language}, max_items={max_items}, dry_run={dry_run}")
+        _append_log(log_fh, f"exclude_patterns={exclude_patterns}")
+        _append_log(log_fh, f"skip_imports={skip_imports}")
+
+        scanned = 0
+        generated = 0
+        skipped = 0
+        errors = 0
+        results: List[DocResult] = []
+
+        remaining = max_items if max_items is not None else float("inf")
+
+        # Stream modules straight from the walker into the AI pipeline:
+        # each parsed module is inspected (and usually dropped) as it
+        # arrives, and eligible targets are submitted to the thread pool
+        # immediately — AI calls for the first files overlap parsing of
+        # the rest, and peak memory stays at the retained targets only.
+        # skip_documented lets the parser drop fully documented files on
+        # a cheap header scan before ast.parse.
+        targets: List[Tuple[ModuleDoc, Optional[ClassDoc], FunctionDoc]] = []
+        futs: Dict[Any, int] = {}
+        ai = None
+        max_workers = batch_size or _DEFAULT_WORKERS
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            for m in iter_parse_python_project(
+                target_dir, exclude_patterns=exclude_patterns, skip_documented=True
+            ):
                 if remaining <= 0:
                     break
-                scanned += 1
-                if f.docstring:
-                    skipped += 1
+                candidates: List[Tuple[Optional[ClassDoc], FunctionDoc]] = [(None, f) for f in m.functions]
+                candidates += [(c, f) for c in m.classes for f in c.methods]
+                missing = [(c, f) for c, f in candidates if not f.docstring]
+
+                # Fully documented module: account for it and move on without
+                # touching the file at all (no import scan, no re-parse later).
+                documented = len(candidates) - len(missing)
+                scanned += documented
+                skipped += documented
+                if not missing:
                     continue
-                # module-level skip by heavy imports
+
+                # Detect heavy imports once per module
+                mod_blocked = _file_contains_imports(m.path, skip_imports) if skip_imports else False
                 if mod_blocked:
-                    skipped += 1
-                    _append_log(log_path, f"SKIP METHOD (module blocked): {m.path}::{c.name}.{f.name}:{f.lineno}")
-                    continue
-                if dry_run:
-                    skipped += 1
-                    _append_log(log_path, f"DRY RUN skip generate: {m.path}::{c.name}.{f.name}:{f.lineno}")
-                    continue
-                try:
-                    out = _generate_for_function(
-                        file_path=m.path,
-                        func=f,
-                        style=style,
-                        language=language,
-                        class_ctx=(c.name, c.lineno),
-                    )
-                    results.append(
-                        {
-                            "module": m.module,
-                            "path": m.path,
-                            "class": c.name,
-                            "function": f.name,
-                            "lineno": out["lineno"],
-                            "signature": out["signature"],
-                            "generated_docstring": out["generated_docstring"],
-                        }
-                    )
-                    generated += 1
+                    _append_log(log_fh, f"SKIP MODULE by imports: {m.path}")
+
+                for c, f in missing:
+                    if remaining <= 0:
+                        break
+                    scanned += 1
+                    label = f"{m.path}::{c.name}.{f.name}:{f.lineno}" if c else f"{m.path}::{f.name}:{f.lineno}"
+                    # module-level skip by heavy imports
+                    if mod_blocked:
+                        skipped += 1
+                        _append_log(log_fh, f"SKIP (module blocked): {label}")
+                        continue
+                    if dry_run:
+                        skipped += 1
+                        _append_log(log_fh, f"DRY RUN skip generate: {label}")
+                        continue
+                    if ai is None:
+                        ai = get_ai_service()
+                    futs[
+                        ex.submit(
+                            _generate_for_function,
+                            file_path=m.path,
+                            func=f,
+                            style=style,
+                            language=language,
+                            class_ctx=(c.name, c.lineno) if c else None,
+                            ai=ai,
+                        )
+                    ] = len(targets)
+                    targets.append((m, c, f))
                     remaining -= 1
-                    _append_log(log_path, f"GENERATED: {m.path}::{c.name}.{f.name}:{f.lineno}")
-                except Exception as e:
-                    errors += 1
-                    _append_log(log_path, f"ERROR GEN METHOD: {m.path}::{c.name}.{f.name}:{f.lineno} -> {type(e).__name__}: {e}")
-                    _append_log(log_path, traceback.format_exc())
 
-            if remaining <= 0:
-                break
+            # Each AI call is a network round-trip (GIL released during
+            # socket IO), so a 50-target run drops from 50*T to roughly
+            # T + overhead up to the worker count.
+            outcomes: List[Any] = [None] * len(targets)
+            for fut in as_completed(futs):
+                idx = futs[fut]
+                try:
+                    outcomes[idx] = fut.result()
+                except Exception as e:
+                    outcomes[idx] = e
 
-        if remaining <= 0:
-            break
+        # Per-file pending insertions: (def_line, first_body_line, doc)
+        pending_inserts: Dict[str, List[Tuple[Optional[int], Optional[int], str]]] = {}
 
-    _append_log(log_path, f"Done: scanned={scanned}, generated={generated}, skipped={skipped}, errors={errors}")
+        for (m, c, f), out in zip(targets, outcomes):
+            label = f"{m.path}::{c.name}.{f.name}:{f.lineno}" if c else f"{m.path}::{f.name}:{f.lineno}"
+            if isinstance(out, BaseException):
+                errors += 1
+                _append_log(log_fh, f"ERROR GEN: {label} -> {type(out).__name__}: {out}")
+                _append_log(log_fh, "".join(traceback.format_exception(out)))
+                continue
+            results.append(
+                DocResult(
+                    module=m.module,
+                    path=m.path,
+                    cls=c.name if c else None,
+                    function=f.name,
+                    lineno=out["lineno"],
+                    signature=out["signature"],
+                    generated_docstring=out["generated_docstring"],
+                )
+            )
+            generated += 1
+            _append_log(log_fh, f"GENERATED: {label}")
+            if out["generated_docstring"]:
+                pending_inserts.setdefault(m.path, []).append(
+                    (f.lineno, f.body_lineno, out["generated_docstring"])
+                )
 
-    return {
-        "target_dir": target_dir,
-        "summary": {
-            "scanned": scanned,
-            "generated": generated,
-            "skipped": skipped,
-            "errors": errors,
-        },
-        "results": results,
-        "errors_detail_path": log_path,
-    }
+        # Write each touched file exactly once: all insertions are applied
+        # bottom-up in memory, so parse-time line numbers stay valid, then
+        # swapped in atomically.
+        for path, inserts in pending_inserts.items():
+            # The generation phase already pulled this file through the
+            # parse cache; reuse those bytes instead of re-reading from
+            # disk (no writes have touched the file yet this run).
+            try:
+                cached_lines, _ = _load_parsed(path, os.stat(path).st_mtime_ns)
+                cached_src: Optional[bytes] = b"".join(cached_lines)
+            except Exception:
+                cached_src = None
+            applied = _apply_docstring_inserts(path, inserts, src=cached_src)
+            if applied == len(inserts):
+                _append_log(log_fh, f"WROTE {applied} docstring(s): {path}")
+            else:
+                errors += 1
+                _append_log(log_fh, f"ERROR WRITE: {path} (applied {applied}/{len(inserts)})")
+
+        _append_log(log_fh, f"Done: scanned={scanned}, generated={generated}, skipped={skipped}, errors={errors}")
+
+        # Drop cached sources/trees at exit: entries are keyed on mtime, so
+        # the files just rewritten above would be dead weight anyway, and a
+        # long-lived server should not pin whole projects in memory between runs.
+        _load_parsed.cache_clear()
+
+        return {
+            "target_dir": target_dir,
+            "summary": {
+                "scanned": scanned,
+                "generated": generated,
+                "skipped": skipped,
+                "errors": errors,
+            },
+            "results": [r.to_dict() for r in results],
+            "errors_detail_path": log_path,
+        }
+    finally:
+        log_fh.close()
@@ -3,45 +3,68 @@ from __future__ import annotations
 import os
 import ast
 import fnmatch
-from dataclasses import dataclass
-from typing import List, Optional, Union
-
-from pydantic import BaseModel, Field
+import functools
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 
 # ---------------------------
 # Data Models
 # ---------------------------
+#
+# Plain slots dataclasses rather than Pydantic models: every field is
+# filled from AST nodes that are already well-typed, so per-instance
+# validation is pure overhead when constructing tens of thousands of
+# parameters on a large repo. model_dump() is kept as a shim so JSON
+# consumers are unaffected.
+
+class _DocBase:
+    __slots__ = ()
+
+    def model_dump(self) -> Dict[str, Any]:
+        return asdict(self)
 
-class ParameterDoc(BaseModel):
+
+@dataclass(slots=True)
+class ParameterDoc(_DocBase):
     name: str
     annotation: Optional[str] = None
     has_default: bool = False
     kind: str = "positional"  # positional | vararg | kwonly | varkw
 
 
-class FunctionDoc(BaseModel):
+@dataclass(slots=True)
+class FunctionDoc(_DocBase):
     name: str
     lineno: int
     docstring: Optional[str] = None
-    parameters: List[ParameterDoc] = Field(default_factory=list)
+    parameters: List[ParameterDoc] = field(default_factory=list)
     returns: Optional[str] = None
     is_method: bool = False
+    # Location refs captured at parse time so downstream consumers can
+    # slice source and anchor insertions without re-parsing the file
+    end_lineno: Optional[int] = None
+    body_lineno: Optional[int] = None
+    col_offset: int = 0
 
 
-class ClassDoc(BaseModel):
+@dataclass(slots=True)
+class ClassDoc(_DocBase):
     name: str
     lineno: int
     docstring: Optional[str] = None
-    methods: List[FunctionDoc] = Field(default_factory=list)
+    methods: List[FunctionDoc] = field(default_factory=list)
 
 
-class ModuleDoc(BaseModel):
+@dataclass(slots=True)
+class ModuleDoc(_DocBase):
     path: str               # absolute file path
     module: str             # dotted module name (relative to project root)
     docstring: Optional[str] = None
-    classes: List[ClassDoc] = Field(default_factory=list)
-    functions: List[FunctionDoc] = Field(default_factory=list)
+    classes: List[ClassDoc] = field(default_factory=list)
+    functions: List[FunctionDoc] = field(default_factory=list)
 
 
 # ---------------------------
@@ -68,6 +91,16 @@ _SKIP_DIRS = {
 def _should_skip_dir(dir_name: str) -> bool:
     return dir_name in _SKIP_DIRS or dir_name.startswith(".")
 
+@functools.lru_cache(maxsize=None)
+def _exclude_regex(patterns: Tuple[str, ...]) -> "re.Pattern[str]":
+    """
+    Combine glob exclude patterns into one compiled alternation, so each
+    path is tested with a single regex match instead of per-pattern
+    fnmatch calls (which re-translate the glob every time).
+    """
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+
+
 def _is_excluded(rel_path: str, patterns: Optional[List[str]]) -> bool:
     """
     Check whether a relative path matches any of the exclude patterns (glob).
@@ -76,10 +109,7 @@ def _is_excluded(rel_path: str, patterns: Optional[List[str]]) -> bool:
         return False
     # Normalize to forward slashes for matching
     norm = rel_path.replace(os.sep, "/")
-    for pat in patterns:
-        if fnmatch.fnmatch(norm, pat):
-            return True
-    return False
+    return _exclude_regex(tuple(patterns)).match(norm) is not None
 
 
 def _rel_module_name(project_root: str, file_path: str) -> str:
@@ -106,6 +136,65 @@ def _unparse(node: Optional[ast.AST]) -> Optional[str]:
         return None
 
 
+def _fmt_annot(node: Optional[ast.AST]) -> Optional[str]:
+    """
+    Format a type annotation without a full ast.unparse visitor walk.
+
+    Covers the node shapes that make up nearly all real annotations
+    (Name, dotted Attribute, Subscript, Tuple, Constant, PEP 604
+    unions); anything else falls back to _unparse. Runs per parameter
+    per function, hence the hand-rolled fast path.
+    """
+    if node is None:
+        return None
+    t = type(node)
+    if t is ast.Name:
+        return node.id
+    if t is ast.Attribute:
+        base = _fmt_annot(node.value)
+        return f"{base}.{node.attr}" if base is not None else _unparse(node)
+    if t is ast.Subscript:
+        base = _fmt_annot(node.value)
+        inner = _fmt_annot(node.slice)
+        if base is not None and inner is not None:
+            return f"{base}[{inner}]"
+        return _unparse(node)
+    if t is ast.Tuple:
+        parts = [_fmt_annot(e) for e in node.elts]
+        if all(p is not None for p in parts):
+            return ", ".join(parts)  # type: ignore[arg-type]
+        return _unparse(node)
+    if t is ast.Constant:
+        if node.value is Ellipsis:
+            return "..."
+        return repr(node.value)
+    if t is ast.BinOp and type(node.op) is ast.BitOr:
+        left = _fmt_annot(node.left)
+        right = _fmt_annot(node.right)
+        if left is not None and right is not None:
+            return f"{left} | {right}"
+        return _unparse(node)
+    return _unparse(node)
+
+
+def _has_docstring(node: ast.AST) -> bool:
+    """
+    Boolean-only docstring probe: checks body[0] shape directly without
+    ast.get_docstring's cleandoc pass. Lets the parse loop skip
+    get_docstring entirely for undocumented defs (the common case in
+    the docgen path).
+    """
+    body = getattr(node, "body", None)
+    if not body:
+        return False
+    first = body[0]
+    return (
+        type(first) is ast.Expr
+        and type(first.value) is ast.Constant
+        and isinstance(first.value.value, str)
+    )
+
+
 def _parse_parameters(args: ast.arguments) -> List[ParameterDoc]:
     params: List[ParameterDoc] = []
 
@@ -113,7 +202,7 @@ def _parse_parameters(args: ast.arguments) -> List[ParameterDoc]:
         params.append(
             ParameterDoc(
                 name=a.arg,
-                annotation=_unparse(a.annotation),
+                annotation=_fmt_annot(a.annotation),
                 has_default=has_default,
                 kind=kind,
             )
@@ -158,40 +247,83 @@ def _parse_function(node: Union[ast.FunctionDef, ast.AsyncFunctionDef], is_metho
     return FunctionDoc(
         name=node.name,
         lineno=getattr(node, "lineno", 1),
-        docstring=ast.get_docstring(node),
+        docstring=ast.get_docstring(node) if _has_docstring(node) else None,
         parameters=params,
-        returns=_unparse(node.returns),
+        returns=_fmt_annot(node.returns),
         is_method=is_method,
+        end_lineno=getattr(node, "end_lineno", None),
+        body_lineno=node.body[0].lineno if node.body else None,
+        col_offset=getattr(node, "col_offset", 0),
     )
 
 
 def _parse_class(node: ast.ClassDef) -> ClassDoc:
     methods: List[FunctionDoc] = []
     for b in node.body:
-        if isinstance(b, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        # type() comparison skips the MRO walk isinstance pays per node
+        t = type(b)
+        if t is ast.FunctionDef or t is ast.AsyncFunctionDef:
             methods.append(_parse_function(b, is_method=True))
     return ClassDoc(
         name=node.name,
         lineno=getattr(node, "lineno", 1),
-        docstring=ast.get_docstring(node),
+        docstring=ast.get_docstring(node) if _has_docstring(node) else None,
         methods=methods,
     )
 
 
-def parse_file(file_path: str, project_root: str) -> ModuleDoc:
-    with open(file_path, "r", encoding="utf-8") as f:
+# Preflight scan for the docgen path: count defs, and defs whose
+# single-line signature is directly followed by a docstring. Only when
+# the two counts agree (and are non-zero) is the file treated as fully
+# documented — multi-line signatures, nested parens in defaults, or
+# one-line bodies never match the documented pattern, so anything the
+# regexes can't prove falls through to a full parse.
+_DEF_RE = re.compile(rb"^[ \t]*(?:async[ \t]+)?def[ \t]+\w+", re.MULTILINE)
+_DOC_DEF_RE = re.compile(
+    rb"^[ \t]*(?:async[ \t]+)?def[ \t]+\w+\([^()]*\)[^:\n]*:[ \t]*(?:#[^\n]*)?\n"
+    rb"(?:[ \t]*\n)*[ \t]+[rbu]?(?:\"\"\"|''')",
+    re.MULTILINE,
+)
+
+
+def _likely_fully_documented(src: bytes) -> bool:
+    """
+    True only when every def in the source provably has a docstring on
+    its first body line. Conservative: any construct the regexes cannot
+    classify yields False (caller does the full parse).
+    """
+    defs = _DEF_RE.findall(src)
+    if not defs:
+        return False
+    return len(_DOC_DEF_RE.findall(src)) == len(defs)
+
+
+def parse_file(file_path: str, project_root: str, skip_documented: bool = False) -> ModuleDoc:
+    # Read bytes and hand them to ast.parse directly: it decodes per the
+    # source's coding declaration itself, so the TextIOWrapper decode +
+    # newline translation of a text-mode read is pure overhead here.
+    with open(file_path, "rb") as f:
         src = f.read()
 
+    if skip_documented and _likely_fully_documented(src):
+        # Docgen never revisits a fully documented file; skip ast.parse
+        # entirely and return an empty listing for it.
+        return ModuleDoc(
+            path=os.path.abspath(file_path),
+            module=_rel_module_name(project_root, file_path),
+        )
+
     module_node = ast.parse(src, filename=file_path, mode="exec")
-    mod_doc = ast.get_docstring(module_node)
+    mod_doc = ast.get_docstring(module_node) if _has_docstring(module_node) else None
 
     classes: List[ClassDoc] = []
     functions: List[FunctionDoc] = []
 
     for node in module_node.body:
-        if isinstance(node, ast.ClassDef):
+        t = type(node)
+        if t is ast.ClassDef:
             classes.append(_parse_class(node))
-        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        elif t is ast.FunctionDef or t is ast.AsyncFunctionDef:
             functions.append(_parse_function(node, is_method=False))
 
     return ModuleDoc(
@@ -203,42 +335,126 @@ def parse_file(file_path: str, project_root: str) -> ModuleDoc:
     )
 
 
-def parse_python_project(root_dir: str, exclude_patterns: Optional[List[str]] = None) -> List[ModuleDoc]:
+def _iter_py_files(root_dir: str, exclude_patterns: Optional[List[str]] = None) -> Iterator[str]:
+    """
+    Yield candidate .py file paths under root_dir, pruning skipped
+    directories and exclude patterns.
+
+    Uses os.scandir rather than os.walk: DirEntry caches the dir/file
+    classification from the directory read itself, so entries are
+    classified without an extra stat each, and paths stream out as
+    they are found instead of per-directory lists.
+    """
+    yield from _scan_dir(root_dir, root_dir, exclude_patterns)
+
+
+def _scan_dir(
+    dir_path: str, base_root: str, exclude_patterns: Optional[List[str]]
+) -> Iterator[str]:
+    # Exclude globs are matched relative to base_root (the project root)
+    # at every depth, so recursion carries it through unchanged.
+    try:
+        it = os.scandir(dir_path)
+    except OSError:
+        return
+    with it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if _should_skip_dir(entry.name):
+                    continue
+                if exclude_patterns and _is_excluded(
+                    os.path.relpath(entry.path, base_root), exclude_patterns
+                ):
+                    continue
+                yield from _scan_dir(entry.path, base_root, exclude_patterns)
+            elif entry.name.endswith(".py"):
+                if exclude_patterns and _is_excluded(
+                    os.path.relpath(entry.path, base_root), exclude_patterns
+                ):
+                    continue
+                yield entry.path
+
+
+def _collect_py_files(root_dir: str, exclude_patterns: Optional[List[str]] = None) -> List[str]:
+    """
+    Materialized form of _iter_py_files for callers that need len()
+    (e.g. the serial-vs-parallel threshold).
+    """
+    return list(_iter_py_files(root_dir, exclude_patterns))
+
+
+def _parse_file_safe(
+    file_path: str, project_root: str, skip_documented: bool = False
+) -> Optional[ModuleDoc]:
+    """
+    parse_file wrapper that swallows per-file failures (syntax errors,
+    encoding issues); returns None so callers can filter.
+    """
+    try:
+        return parse_file(file_path, project_root=project_root, skip_documented=skip_documented)
+    except SyntaxError:
+        # Skip files with syntax errors; could log if needed
+        return None
+    except UnicodeDecodeError:
+        return None
+    except Exception:
+        # Be robust; upstream can collect errors as needed
+        return None
+
+
+# Below this file count, process startup overhead outweighs parallel parsing
+_PARALLEL_MIN_FILES = 50
+
+
+def parse_python_project(
+    root_dir: str,
+    exclude_patterns: Optional[List[str]] = None,
+    skip_documented: bool = False,
+) -> List[ModuleDoc]:
     """
     Traverse a project directory, parse all .py files (excluding skipped dirs),
     and return a list of ModuleDoc structures.
+
+    Large projects are parsed with a process pool (AST parsing is CPU-bound
+    and independent per file); small ones stay single-process to avoid
+    executor startup cost.
     """
     root_dir = os.path.abspath(root_dir)
-    results: List[ModuleDoc] = []
-
-    for current_root, dirs, files in os.walk(root_dir):
-        # mutate dirs in-place to prune traversal
-        dirs[:] = [d for d in dirs if not _should_skip_dir(d)]
-        if exclude_patterns:
-            # Exclude directories by glob patterns relative to project root
-            dirs[:] = [
-                d for d in dirs
-                if not _is_excluded(os.path.relpath(os.path.join(current_root, d), root_dir), exclude_patterns)
-            ]
-
-        for fn in files:
-            if not fn.endswith(".py"):
-                continue
-            file_path = os.path.join(current_root, fn)
-            if exclude_patterns and _is_excluded(os.path.relpath(file_path, root_dir), exclude_patterns):
-                continue
-            try:
-                results.append(parse_file(file_path, project_root=root_dir))
-            except SyntaxError:
-                # Skip files with syntax errors; could log if needed
-                continue
-            except UnicodeDecodeError:
-                continue
-            except Exception:
-                # Be robust; upstream can collect errors as needed
-                continue
+    paths = _collect_py_files(root_dir, exclude_patterns)
+
+    if len(paths) < _PARALLEL_MIN_FILES:
+        parsed = [_parse_file_safe(p, root_dir, skip_documented) for p in paths]
+    else:
+        worker = functools.partial(
+            _parse_file_safe, project_root=root_dir, skip_documented=skip_documented
+        )
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            # chunked map amortizes IPC/pickling overhead per task batch
+            parsed = list(ex.map(worker, paths, chunksize=32))
+
+    return [m for m in parsed if m is not None]
 
-    return results
+
+def iter_parse_python_project(
+    root_dir: str,
+    exclude_patterns: Optional[List[str]] = None,
+    skip_documented: bool = False,
+) -> Iterator[ModuleDoc]:
+    """
+    Streaming variant of parse_python_project: yields ModuleDoc one at a
+    time so callers can process (and drop) modules without materializing
+    the whole project list in memory. Parses single-process since
+    consumers drive the pace.
+    """
+    root_dir = os.path.abspath(root_dir)
+    for file_path in _iter_py_files(root_dir, exclude_patterns):
+        mod = _parse_file_safe(file_path, root_dir, skip_documented)
+        if mod is not None:
+            yield mod
 
 
 # Optional: quick self-check when run directly
@@ -1,4 +1,5 @@
 import os
+import shutil
 import subprocess
 from typing import Optional
 from uuid import uuid4
@@ -12,6 +13,19 @@ def _is_dir_empty(path: str) -> bool:
     return os.path.isdir(path) and len(os.listdir(path)) == 0
 
 
+def _clear_dir(path: str) -> None:
+    """Remove the contents of a directory, keeping the directory itself."""
+    for name in os.listdir(path):
+        p = os.path.join(path, name)
+        if os.path.isdir(p) and not os.path.islink(p):
+            shutil.rmtree(p, ignore_errors=True)
+        else:
+            try:
+                os.unlink(p)
+            except OSError:
+                pass
+
+
 def get_runtime_root(project_root: str) -> str:
     """
     Get or create runtime directory under project root.
@@ -21,12 +35,43 @@ def get_runtime_root(project_root: str) -> str:
     return rt
 
 
+def _sparse_clone(repo_url: str, dest_dir: str, depth: int, timeout: int) -> None:
+    """
+    Blobless sparse clone: fetch trees/commits only, then check out just
+    the files the doc pipeline reads (Python sources, pyproject, README).
+    Cuts transfer and checkout time dramatically on large repositories.
+    """
+    subprocess.run(
+        ["git", "clone", "--filter=blob:none", "--no-checkout", "--depth", str(depth), repo_url, dest_dir],
+        check=True,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    # --no-cone: cone mode cannot express glob patterns like "*.py"
+    subprocess.run(
+        ["git", "-C", dest_dir, "sparse-checkout", "set", "--no-cone", "*.py", "pyproject.toml", "README.md"],
+        check=True,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    subprocess.run(
+        ["git", "-C", dest_dir, "checkout"],
+        check=True,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+
+
 def clone_repo(
     repo_url: str,
     work_root: Optional[str] = None,
     dest_dir: Optional[str] = None,
     depth: int = 1,
     timeout: int = 180,
+    sparse: bool = False,
 ) -> str:
     """
     Clone a git repo.
@@ -35,6 +80,9 @@ def clone_repo(
         * If dest_dir exists but empty -> reuse it
         * Ensure parent directory exists
     - Else: clone into a new temporary directory under work_root (or project runtime).
+    - If sparse is True, attempt a blobless sparse clone (only *.py,
+      pyproject.toml and README.md are checked out); falls back to a
+      full shallow clone if the git version lacks partial-clone support.
 
     Returns:
         The cloned directory path.
@@ -66,6 +114,36 @@ def clone_repo(
         dest_dir = os.path.join(work_root, f"tmp-{uuid4().hex}")
         _ensure_dir(dest_dir)
 
+    if sparse:
+        try:
+            _sparse_clone(repo_url, dest_dir, depth=depth, timeout=timeout)
+            return dest_dir
+        except subprocess.CalledProcessError:
+            # Server may be missing partial-clone support or git may be
+            # too old for sparse-checkout: retry as a full shallow clone.
+            _clear_dir(dest_dir)
+
+    # Prefer an in-process clone when pygit2 (libgit2 bindings) is
+    # available: no fork/exec of the git binary and no stdout
+    # marshalling per clone. Fall back to subprocess git otherwise.
+    try:
+        import pygit2  # type: ignore[import-not-found]
+    except Exception:
+        pygit2 = None
+
+    if pygit2 is not None:
+        try:
+            pygit2.clone_repository(repo_url, dest_dir, depth=depth)
+            return dest_dir
+        except Exception:
+            # GitError here frequently means the clone needs credentials
+            # that only the system git can obtain (ssh agent, credential
+            # helpers, gitconfig URL rewrites) — pygit2 is invoked with
+            # no credential callbacks. Likewise an older pygit2 without
+            # depth support. Either way, fall through to subprocess git
+            # and let that attempt raise the documented errors.
+            _clear_dir(dest_dir)
+
     cmd = ["git", "clone", "--depth", str(depth), repo_url, dest_dir]
 
     # Execute clone
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import fnmatch
+import functools
+import logging
 import os
+import re
 import shutil
 import subprocess
 import sys
+import threading
 import time
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -13,30 +17,87 @@ from app.services.repo import get_runtime_root
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Snapshot of the process environment taken once: each build overlays
+# just its own variables instead of re-copying every env var per call.
+_BASE_ENV: Dict[str, str] = dict(os.environ)
+
 
 def _ts() -> str:
     return time.strftime("%Y%m%d-%H%M%S")
 
 
+@functools.lru_cache(maxsize=1)
+def _runtime_root() -> str:
+    # get_runtime_root stats and makedirs on every call; the location is
+    # fixed for the life of the process, so resolve it once.
+    return get_runtime_root(PROJECT_ROOT)
+
+
+@functools.lru_cache(maxsize=1)
+def _mkdocs_cmd() -> Optional[str]:
+    # PATH walk + per-candidate stat; stable for the process lifetime,
+    # so cache it (cleared when _ensure_mkdocs_deps installs anything).
+    return shutil.which("mkdocs")
+
+
+# Directories already created this build: makedirs stats every path
+# component, and _write_text re-ensures the same dirs page after page.
+_ensured_dirs: set = set()
+_ensured_dirs_lock = threading.Lock()
+
+
 def _ensure_dir(p: str) -> None:
+    if p in _ensured_dirs:
+        return
     os.makedirs(p, exist_ok=True)
+    with _ensured_dirs_lock:
+        _ensured_dirs.add(p)
 
 
 def _write_text(path: str, content: str) -> None:
     _ensure_dir(os.path.dirname(path))
-    with open(path, "w", encoding="utf-8") as f:
+    # 64 KiB buffer: typical generated pages flush in a single write
+    with open(path, "w", encoding="utf-8", buffering=1 << 16) as f:
         f.write(content)
 
 
+@functools.lru_cache(maxsize=None)
+def _exclude_regex(patterns: Tuple[str, ...]) -> "re.Pattern[str]":
+    # One compiled alternation per pattern list: a single C-level match
+    # per path instead of per-pattern fnmatch dispatch in Python.
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+
+
+# Names never worth documenting or traversing; frozenset membership is
+# O(1) and the check runs before any stat-like call.
+_SKIP_DIR_NAMES = frozenset({
+    ".git",
+    ".mcp_docsite",
+    "_site",
+    ".venv",
+    "venv",
+    "env",
+    ".env",
+    "__pycache__",
+    "node_modules",
+    ".tox",
+    ".mypy_cache",
+    ".pytest_cache",
+    "build",
+    "dist",
+})
+
+
+def _is_skipped_name(name: str) -> bool:
+    return name in _SKIP_DIR_NAMES or name.endswith(".egg-info")
+
+
 def _should_exclude(rel_path: str, exclude_patterns: Optional[List[str]]) -> bool:
     if not exclude_patterns:
         return False
     # Normalize to forward slashes for glob matching
     rp = rel_path.replace("\\", "/")
-    for pat in exclude_patterns:
-        if fnmatch.fnmatch(rp, pat):
-            return True
-    return False
+    return _exclude_regex(tuple(exclude_patterns)).match(rp) is not None
 
 
 def _discover_top_modules(project_dir: str, exclude_patterns: Optional[List[str]]) -> Tuple[List[str], List[str]]:
@@ -52,49 +113,59 @@ def _discover_top_modules(project_dir: str, exclude_patterns: Optional[List[str]
     # Always consider project root on sys.path
     sys_path_additions.append(project_dir)
 
-    # src layout
+    # src layout — scandir classifies entries from the directory read
+    # itself (no stat per entry); the exclude check runs before any
+    # further syscall so excluded paths cost nothing.
     src_dir = os.path.join(project_dir, "src")
     if os.path.isdir(src_dir):
         sys_path_additions.append(src_dir)
         # find top-level packages under src
-        for name in os.listdir(src_dir):
-            abs_p = os.path.join(src_dir, name)
-            rel_p = os.path.relpath(abs_p, project_dir)
-            if _should_exclude(rel_p, exclude_patterns):
-                continue
-            if os.path.isdir(abs_p):
-                if os.path.isfile(os.path.join(abs_p, "__init__.py")):
-                    module_names.append(name)
-            elif name.endswith(".py") and name != "__init__.py":
-                module_names.append(os.path.splitext(name)[0])
+        with os.scandir(src_dir) as it:
+            for entry in it:
+                if _is_skipped_name(entry.name):
+                    continue
+                rel_p = os.path.join("src", entry.name)
+                if _should_exclude(rel_p, exclude_patterns):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if os.path.isfile(os.path.join(entry.path, "__init__.py")):
+                        module_names.append(entry.name)
+                elif entry.name.endswith(".py") and entry.name != "__init__.py":
+                    module_names.append(os.path.splitext(entry.name)[0])
 
     # top-level packages in project root (non-src)
-    for name in os.listdir(project_dir):
-        if name in {".git", ".mcp_docsite", "_site", ".venv", "venv", "env", ".env"}:
-            continue
-        abs_p = os.path.join(project_dir, name)
-        rel_p = os.path.relpath(abs_p, project_dir)
-        if _should_exclude(rel_p, exclude_patterns):
-            continue
-
-        if os.path.isdir(abs_p):
-            if os.path.isfile(os.path.join(abs_p, "__init__.py")):
-                if name not in module_names:
-                    module_names.append(name)
-        elif name.endswith(".py"):
-            mod = os.path.splitext(name)[0]
-            if mod not in module_names:
-                module_names.append(mod)
-
-    # Deduplicate preserving order
-    seen = set()
-    dedup: List[str] = []
-    for m in module_names:
-        if m not in seen:
-            seen.add(m)
-            dedup.append(m)
-
-    return dedup, sys_path_additions
+    with os.scandir(project_dir) as it:
+        for entry in it:
+            name = entry.name
+            if _is_skipped_name(name):
+                continue
+            if _should_exclude(name, exclude_patterns):
+                continue
+
+            if entry.is_dir(follow_symlinks=False):
+                if os.path.isfile(os.path.join(entry.path, "__init__.py")):
+                    if name not in module_names:
+                        module_names.append(name)
+            elif name.endswith(".py"):
+                mod = os.path.splitext(name)[0]
+                if mod not in module_names:
+                    module_names.append(mod)
+
+    # Deduplicate preserving order (dicts keep insertion order)
+    return list(dict.fromkeys(module_names)), sys_path_additions
+
+
+# mkdocstrings page emitted per module; formatted once per module name
+_MODULE_PAGE_TMPL = (
+    "# {m}\n"
+    "\n"
+    "::: {m}\n"
+    "    options:\n"
+    "      docstring_style: {fmt}\n"
+    "      show_root_heading: true\n"
+    "      show_source: true\n"
+    "      merge_init_into_class: true\n"
+)
 
 
 def _prepare_mkdocs_project(
@@ -102,42 +173,54 @@ def _prepare_mkdocs_project(
     modules: List[str],
     docformat: str,
     temp_root: str,
+    run_ts: Optional[str] = None,
 ) -> Tuple[str, str]:
     """
     Create a temporary mkdocs project with mkdocstrings pages.
     Returns:
       (mkdocs_yml_path, docs_dir)
     """
-    mk_root = os.path.join(temp_root, ".mcp_docsite", _ts())
+    mk_root = os.path.join(temp_root, ".mcp_docsite", run_ts or _ts())
     docs_dir = os.path.join(mk_root, "docs")
     _ensure_dir(docs_dir)
 
-    # index.md from README.md if exists
+    # index.md from README.md if exists; mkdocs only reads it, so a
+    # hardlink (or symlink) moves zero bytes — copy only as last resort
     readme_src = os.path.join(project_dir, "README.md")
     index_md = os.path.join(docs_dir, "index.md")
     if os.path.isfile(readme_src):
         try:
-            shutil.copyfile(readme_src, index_md)
-        except Exception:
-            _write_text(index_md, "# 项目文档\n\n本文档由 MCP DocSite 自动生成。")
+            os.link(readme_src, index_md)
+        except OSError:
+            try:
+                os.symlink(readme_src, index_md)
+            except OSError:
+                try:
+                    shutil.copyfile(readme_src, index_md)
+                except Exception:
+                    _write_text(index_md, "# 项目文档\n\n本文档由 MCP DocSite 自动生成。")
     else:
         _write_text(index_md, "# 项目文档\n\n本文档由 MCP DocSite 自动生成。")
 
-    # api.md with mkdocstrings directives
-    api_md = os.path.join(docs_dir, "api.md")
-    lines = ["# API 参考\n"]
+    # One API page per module plus a TOC: mkdocstrings renders pages
+    # independently, which also lets grouped builds split by module.
+    toc_lines = ["# API 参考\n"]
+    nav_api_lines = ["  - API 参考:", "      - 概览: api/index.md"]
     if modules:
         for m in modules:
-            lines.append(f"## {m}\n")
-            # mkdocstrings directive
-            # Use options to set docstring style
-            lines.append(f"::: {m}\n    options:\n      docstring_style: {docformat}\n      show_root_heading: true\n      show_source: true\n      merge_init_into_class: true\n")
+            _write_text(
+                os.path.join(docs_dir, "api", f"{m}.md"),
+                _MODULE_PAGE_TMPL.format(m=m, fmt=docformat),
+            )
+            toc_lines.append(f"- [{m}](./{m}.md)")
+            nav_api_lines.append(f"      - {m}: api/{m}.md")
     else:
-        lines.append("暂无可识别模块。\n")
-    _write_text(api_md, "\n".join(lines))
+        toc_lines.append("暂无可识别模块。\n")
+    _write_text(os.path.join(docs_dir, "api", "index.md"), "\n".join(toc_lines))
 
     # mkdocs.yml
     mkdocs_yml = os.path.join(mk_root, "mkdocs.yml")
+    nav_api = "\n".join(nav_api_lines)
     mk = f"""site_name: Project Documentation
 site_url: ""
 theme:
@@ -161,37 +244,109 @@ markdown_extensions:
   - codehilite
 nav:
   - 首页: index.md
-  - API 参考: api.md
+{nav_api}
 """
     _write_text(mkdocs_yml, mk)
 
     return mkdocs_yml, docs_dir
 
 
-def _run_subprocess(cmd: List[str], cwd: Optional[str], env: Dict[str, str], timeout: int, log_lines: List[str]) -> int:
+class _LogListHandler(logging.Handler):
+    """Mirror log records into the build's log_lines list."""
+
+    def __init__(self, lines: List[str]) -> None:
+        super().__init__()
+        self._lines = lines
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._lines.append(self.format(record))
+        except Exception:
+            pass
+
+
+def _run_subprocess(cmd: List[str], cwd: Optional[str], env: Dict[str, str], timeout: int, log_lines: Any) -> int:
+    """
+    Run a build command streaming its output line by line.
+
+    capture_output buffered the child's entire stdout+stderr in memory
+    and could deadlock once the OS pipe filled on chatty builds; here
+    stderr is merged into stdout (one pipe to drain, ordering kept) and
+    drained as it arrives, with a timer killing the child on timeout.
+    """
     log_lines.append(f"$ {' '.join(cmd)}")
     try:
-        res = subprocess.run(cmd, cwd=cwd, env=env, timeout=timeout, capture_output=True, text=True)
-        if res.stdout:
-            log_lines.append(res.stdout)
-        if res.stderr:
-            log_lines.append(res.stderr)
-        return res.returncode
-    except subprocess.TimeoutExpired as e:
-        log_lines.append(f"Timeout: {e}")
-        return 124
+        proc = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
     except Exception as e:
         log_lines.append(f"Exception: {type(e).__name__}: {e}")
         return 1
 
+    timed_out = False
+
+    def _kill() -> None:
+        nonlocal timed_out
+        timed_out = True
+        proc.kill()
+
+    timer = threading.Timer(timeout, _kill)
+    timer.start()
+    try:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            log_lines.append(line.rstrip())
+        rc = proc.wait()
+    except Exception as e:
+        log_lines.append(f"Exception: {type(e).__name__}: {e}")
+        proc.kill()
+        rc = 1
+    finally:
+        timer.cancel()
 
-def _write_log(lines: List[str]) -> str:
-    runtime_root = get_runtime_root(PROJECT_ROOT)
-    logs_dir = os.path.join(runtime_root, "logs")
-    _ensure_dir(logs_dir)
-    path = os.path.join(logs_dir, f"docsite-{_ts()}.log")
-    _write_text(path, "\n".join(lines))
-    return path
+    if timed_out:
+        log_lines.append(f"Timeout: command killed after {timeout}s")
+        return 124
+    return rc
+
+
+class _LogSink:
+    """
+    Append-style build log that streams lines to disk as they arrive.
+
+    Drop-in for the previous in-memory list (same append/extend calls
+    from _run_subprocess and the logging handler) but keeps resident
+    memory O(1) in output size and lets users tail the log live.
+    """
+
+    def __init__(self, ts: str) -> None:
+        logs_dir = os.path.join(_runtime_root(), "logs")
+        _ensure_dir(logs_dir)
+        self.path = os.path.join(logs_dir, f"docsite-{ts}.log")
+        self._fh = open(self.path, "w", encoding="utf-8", buffering=1 << 16)
+
+    def append(self, line: str) -> None:
+        try:
+            self._fh.write(line + "\n")
+        except Exception:
+            pass
+
+    def extend(self, lines: List[str]) -> None:
+        for line in lines:
+            self.append(line)
+
+    def close(self) -> str:
+        try:
+            self._fh.close()
+        except Exception:
+            pass
+        return self.path
 
 
 def build_static_site(
@@ -218,7 +373,11 @@ def build_static_site(
         "errors_detail_path": "...",
       }
     """
-    log_lines: List[str] = []
+    # One timestamp per build: the temp mkdocs dir and the log file
+    # share it, so a run's artifacts correlate by name. Log lines go
+    # straight to disk instead of accumulating in memory.
+    run_ts = _ts()
+    log_lines = _LogSink(run_ts)
     try:
         project_dir = os.path.abspath(project_dir)
         if not os.path.isdir(project_dir):
@@ -237,16 +396,22 @@ def build_static_site(
 
         # Prepare temporary mkdocs project
         mkdocs_yml, docs_dir = _prepare_mkdocs_project(
-            project_dir=project_dir, modules=modules, docformat=docformat, temp_root=project_dir
+            project_dir=project_dir, modules=modules, docformat=docformat,
+            temp_root=project_dir, run_ts=run_ts
         )
         mkdocs_root = os.path.dirname(mkdocs_yml)
 
-        # Environment
-        env = os.environ.copy()
-        # Prepend PYTHONPATH with project root and src if present
+        # Environment: overlay PYTHONPATH on the cached base snapshot
         extra_paths = sys_paths
-        pp = env.get("PYTHONPATH", "")
-        env["PYTHONPATH"] = (os.pathsep.join(extra_paths) + (os.pathsep + pp if pp else ""))
+        pp = _BASE_ENV.get("PYTHONPATH", "")
+        env = {
+            **_BASE_ENV,
+            "PYTHONPATH": os.pathsep.join(extra_paths) + (os.pathsep + pp if pp else ""),
+            # Throwaway builds: skip .pyc writes in the analyzed tree and
+            # keep subprocess output unbuffered so the log streams live.
+            "PYTHONDONTWRITEBYTECODE": "1",
+            "PYTHONUNBUFFERED": "1",
+        }
 
         py = sys.executable
 
@@ -254,21 +419,62 @@ def build_static_site(
             if not install_deps:
                 return
             pkgs = ["mkdocs", "mkdocstrings[python]", "mkdocs-material", "griffe"]
-            cmds = [
-                [py, "-m", "pip", "install", "-U", "--default-timeout", "180", "-i", "https://pypi.org/simple"] + pkgs,
-                [py, "-m", "pip", "install", "-U", "--default-timeout", "180", "-i", "https://pypi.tuna.tsinghua.edu.cn/simple"] + pkgs,
-            ]
-            rc = 1
-            for c in cmds:
-                rc = _run_subprocess(c, cwd=mkdocs_root, env=env, timeout=timeout, log_lines=log_lines)
-                log_lines.append(f"pip install deps rc={rc}")
-                if rc == 0:
-                    break
+            if generator.lower() == "auto":
+                # Pre-install the fallback generator too, so a later
+                # mkdocs failure does not trigger a second pip run.
+                pkgs.append("pdoc")
+            # One invocation with a mirror as extra index: pip resolves
+            # each package from whichever index answers, instead of a
+            # full retry of the whole list against the mirror.
+            cmd = [
+                py, "-m", "pip", "install", "-U", "--default-timeout", "180",
+                "--index-url", "https://pypi.org/simple",
+                "--extra-index-url", "https://pypi.tuna.tsinghua.edu.cn/simple",
+            ] + pkgs
+            rc = _run_subprocess(cmd, cwd=mkdocs_root, env=env, timeout=timeout, log_lines=log_lines)
+            log_lines.append(f"pip install deps rc={rc}")
+            if rc == 0:
+                # The install may have put mkdocs on PATH
+                _mkdocs_cmd.cache_clear()
 
         def _try_mkdocs() -> int:
+            # In-process build when mkdocs is importable: skips spawning
+            # a fresh interpreter and re-importing mkdocs/mkdocstrings/
+            # griffe on every build. Falls back to the subprocess path if
+            # the import or the in-process build fails.
+            try:
+                from mkdocs.commands.build import build as mkdocs_build
+                from mkdocs.config import load_config
+            except Exception:
+                mkdocs_build = None
+
+            if mkdocs_build is not None:
+                log_lines.append(f"mkdocs build (in-process): {mkdocs_yml} -> {site_dir}")
+                handler = _LogListHandler(log_lines)
+                mkdocs_logger = logging.getLogger("mkdocs")
+                mkdocs_logger.addHandler(handler)
+                # mkdocstrings resolves modules via sys.path in-process,
+                # mirroring the PYTHONPATH given to the subprocess.
+                added = [p for p in extra_paths if p not in sys.path]
+                sys.path[:0] = added
+                try:
+                    cfg = load_config(config_file=mkdocs_yml, site_dir=site_dir)
+                    mkdocs_build(cfg)
+                    return 0
+                except Exception as e:
+                    log_lines.append(f"mkdocs in-process failed: {type(e).__name__}: {e}")
+                    # fall through to the isolated subprocess attempt
+                finally:
+                    mkdocs_logger.removeHandler(handler)
+                    for p in added:
+                        try:
+                            sys.path.remove(p)
+                        except ValueError:
+                            pass
+
             cmd = ["mkdocs", "build", "-f", mkdocs_yml, "-d", site_dir]
             # Prefer module execution if mkdocs command not on PATH
-            if shutil.which("mkdocs") is None:
+            if _mkdocs_cmd() is None:
                 cmd = [py, "-m", "mkdocs", "build", "-f", mkdocs_yml, "-d", site_dir]
             return _run_subprocess(cmd, cwd=mkdocs_root, env=env, timeout=timeout, log_lines=log_lines)
 
@@ -281,18 +487,26 @@ def build_static_site(
                     if os.path.exists(ap):
                         targets.append(ap)
             if not targets:
-                # prefer src dir
-                srcp = os.path.join(project_dir, "src")
-                if os.path.isdir(srcp):
+                # Snapshot both directory listings once; module lookups
+                # below are then dict hits instead of per-module
+                # os.path.isdir stat calls against root and src.
+                root_entries = {e.name: e for e in os.scandir(project_dir)}
+                src_entry = root_entries.get("src")
+                has_src = src_entry is not None and src_entry.is_dir(follow_symlinks=False)
+                src_entries: Dict[str, os.DirEntry] = {}
+                if has_src:
+                    srcp = os.path.join(project_dir, "src")
                     targets.append(srcp)
+                    src_entries = {e.name: e for e in os.scandir(srcp)}
                 # add discovered module dirs if exist under root or src
                 for m in modules:
-                    cand1 = os.path.join(project_dir, m)
-                    cand2 = os.path.join(srcp, m) if os.path.isdir(srcp) else None
-                    if os.path.isdir(cand1):
-                        targets.append(cand1)
-                    elif cand2 and os.path.isdir(cand2):
-                        targets.append(cand2)
+                    e = root_entries.get(m)
+                    if e is not None and e.is_dir(follow_symlinks=False):
+                        targets.append(e.path)
+                        continue
+                    e = src_entries.get(m)
+                    if e is not None and e.is_dir(follow_symlinks=False):
+                        targets.append(e.path)
                 if not targets:
                     targets = [project_dir]
             cmd = [py, "-m", "pdoc", "--docformat", docformat, "-o", site_dir] + targets
@@ -308,17 +522,17 @@ def build_static_site(
             elif generator.lower() == "auto":
                 # Fallback to pdoc
                 log_lines.append("mkdocs failed, trying pdoc as fallback...")
-                if install_deps:
-                    _run_subprocess([py, "-m", "pip", "install", "-U", "pdoc"], cwd=project_dir, env=env, timeout=timeout, log_lines=log_lines)
+                # pdoc was already installed by _ensure_mkdocs_deps when
+                # install_deps is set (generator == "auto").
                 rc2 = _try_pdoc()
                 if rc2 == 0:
                     generator_used = "pdoc"
                 else:
-                    log_path = _write_log(log_lines)
+                    log_path = log_lines.close()
                     return {"status": "error", "message": "mkdocs and pdoc both failed", "errors_detail_path": log_path}
             else:
                 if rc != 0:
-                    log_path = _write_log(log_lines)
+                    log_path = log_lines.close()
                     return {"status": "error", "message": "mkdocs failed", "errors_detail_path": log_path}
         elif generator.lower() == "pdoc":
             if install_deps:
@@ -327,14 +541,14 @@ def build_static_site(
             if rc == 0:
                 generator_used = "pdoc"
             else:
-                log_path = _write_log(log_lines)
+                log_path = log_lines.close()
                 return {"status": "error", "message": "pdoc failed", "errors_detail_path": log_path}
         else:
-            log_path = _write_log(log_lines)
+            log_path = log_lines.close()
             return {"status": "error", "message": f"Unknown generator: {generator}", "errors_detail_path": log_path}
 
         # Success
-        log_path = _write_log(log_lines)
+        log_path = log_lines.close()
         return {
             "status": "completed",
             "site_dir": site_dir,
@@ -343,5 +557,12 @@ def build_static_site(
         }
 
     except Exception as e:
-        log_path = _write_log(log_lines + [f"Fatal: {type(e).__name__}: {e}"])
-        return {"status": "error", "message": f"{type(e).__name__}: {e}", "errors_detail_path": log_path}
\ No newline at end of file
+        log_lines.append(f"Fatal: {type(e).__name__}: {e}")
+        log_path = log_lines.close()
+        return {"status": "error", "message": f"{type(e).__name__}: {e}", "errors_detail_path": log_path}
+    finally:
+        log_lines.close()
+        # Drop the ensured-dir cache so later builds re-verify (temp
+        # trees may have been deleted between requests).
+        with _ensured_dirs_lock:
+            _ensured_dirs.clear()
\ No newline at end of file
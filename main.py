@@ -8,13 +8,15 @@ Notes:
   - Starts an MCP server using SSE transport.
   - Tools:
       - parse_local(local_path)
-      - generate_from_repo(repo_url, local_path?, dest_dir?, work_root?, depth?, timeout?)
+      - generate_from_repo(repo_url, local_path?, dest_dir?, work_root?, depth?, timeout?, sparse?)
       - generate_docstrings(local_path?, repo_url?, style?, language?, max_items?, depth?, timeout?)
   - FastAPI backend remains available via scripts/run_api.py (REST/Swagger).
 """
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import os
 import sys
 import subprocess
@@ -32,36 +34,47 @@ except Exception as e:
     print('Missing "mcp" package. Install with: pip install "mcp[cli]>=1.12.3"')
     raise
 
-# Services
-from app.services.parser import parse_python_project
-from app.services.repo import clone_repo, get_runtime_root
-from app.services.documentation import generate_missing_docstrings
-from app.services.site_builder import build_static_site
-from app.services.site_builder_builtin import build_builtin_site
+# Services are imported lazily inside each tool body: the MCP server
+# starts serving immediately instead of paying for every service module
+# (and its transitive deps) at process start.
 
 
 def _summarize(docs) -> Dict[str, Any]:
-    modules = len(docs)
-    classes = sum(len(m.classes) for m in docs)
-    functions = sum(len(m.functions) for m in docs)
-    methods = sum(len(c.methods) for m in docs for c in m.classes)
-    missing_module_docs = sum(1 for m in docs if not m.docstring)
-    missing_function_docs = sum(1 for m in docs for f in m.functions if not f.docstring)
-    missing_method_docs = sum(
-        1 for m in docs for c in m.classes for f in c.methods if not f.docstring
-    )
-    top_modules: List[Dict[str, Any]] = [
-        {
-            "module": m.module,
-            "path": m.path,
-            "classes": len(m.classes),
-            "functions": len(m.functions),
-            "has_doc": bool(m.docstring),
-        }
-        for m in docs[:10]
-    ]
+    # Single pass over the parsed modules: the counters and the
+    # top_modules preview are accumulated together instead of walking
+    # the doc tree once per metric.
+    classes = 0
+    functions = 0
+    methods = 0
+    missing_module_docs = 0
+    missing_function_docs = 0
+    missing_method_docs = 0
+    top_modules: List[Dict[str, Any]] = []
+    for m in docs:
+        classes += len(m.classes)
+        functions += len(m.functions)
+        if not m.docstring:
+            missing_module_docs += 1
+        for f in m.functions:
+            if not f.docstring:
+                missing_function_docs += 1
+        for c in m.classes:
+            methods += len(c.methods)
+            for f in c.methods:
+                if not f.docstring:
+                    missing_method_docs += 1
+        if len(top_modules) < 10:
+            top_modules.append(
+                {
+                    "module": m.module,
+                    "path": m.path,
+                    "classes": len(m.classes),
+                    "functions": len(m.functions),
+                    "has_doc": bool(m.docstring),
+                }
+            )
     return {
-        "modules": modules,
+        "modules": len(docs),
         "classes": classes,
         "functions": functions,
         "methods": methods,
@@ -72,31 +85,49 @@ def _summarize(docs) -> Dict[str, Any]:
     }
 
 
+@functools.lru_cache(maxsize=1)
+def _runtime_root() -> str:
+    # Stats and makedirs on first use only; the runtime dir is fixed for
+    # the life of the server process.
+    from app.services.repo import get_runtime_root
+
+    return get_runtime_root(PROJECT_ROOT)
+
+
 mcp = FastMCP("docgen-mcp")
 
 
 @mcp.tool()
-def parse_local(local_path: str) -> Dict[str, Any]:
+async def parse_local(local_path: str) -> Dict[str, Any]:
     """
     Parse and summarize a Python project at the given local path.
     Returns:
       { "target_dir": "...", "summary": { ... } }
     """
-    if not os.path.isdir(local_path):
-        raise ValueError(f"local_path not found or not a directory: {local_path}")
-    target_dir = os.path.abspath(local_path)
-    docs = parse_python_project(target_dir)
-    return {"target_dir": target_dir, "summary": _summarize(docs)}
+
+    def _run() -> Dict[str, Any]:
+        from app.services.parser import parse_python_project
+
+        if not os.path.isdir(local_path):
+            raise ValueError(f"local_path not found or not a directory: {local_path}")
+        target_dir = os.path.abspath(local_path)
+        docs = parse_python_project(target_dir)
+        return {"target_dir": target_dir, "summary": _summarize(docs)}
+
+    # Parsing is CPU/IO bound; run it off the event loop so other MCP
+    # requests (and SSE keepalives) are not blocked behind it.
+    return await asyncio.to_thread(_run)
 
 
 @mcp.tool()
-def generate_from_repo(
+async def generate_from_repo(
     repo_url: str,
     local_path: Optional[str] = None,
     dest_dir: Optional[str] = None,
     work_root: Optional[str] = None,
     depth: int = 1,
     timeout: int = 180,
+    sparse: bool = True,
 ) -> Dict[str, Any]:
     """
     Generate documentation summary from a Git repository.
@@ -105,6 +136,9 @@ def generate_from_repo(
       2) Else if dest_dir provided, clone into that exact directory
       3) Else clone under work_root/tmp-<uuid> (work_root default: project runtime)
 
+    sparse=True (default) uses a blobless sparse clone that only checks
+    out Python sources; set sparse=False to clone the full tree.
+
     Returns:
       { "status": "completed" | "error",
         "mode": "local" | "cloned",
@@ -112,77 +146,85 @@ def generate_from_repo(
         "summary": { ... },
         "note"?: str }
     """
-    try:
-        if local_path and os.path.isdir(local_path):
-            target_dir = os.path.abspath(local_path)
-            docs = parse_python_project(target_dir)
+
+    def _run() -> Dict[str, Any]:
+        from app.services.parser import parse_python_project
+        from app.services.repo import clone_repo
+
+        try:
+            if local_path and os.path.isdir(local_path):
+                target_dir = os.path.abspath(local_path)
+                docs = parse_python_project(target_dir)
+                return {
+                    "status": "completed",
+                    "mode": "local",
+                    "target_dir": target_dir,
+                    "summary": _summarize(docs),
+                }
+
+            # Clone flow
+            wr = work_root
+            if wr:
+                wr = os.path.abspath(wr)
+            else:
+                wr = _runtime_root()
+
+            repo_dir = clone_repo(
+                repo_url,
+                work_root=wr,
+                dest_dir=dest_dir,
+                depth=depth,
+                timeout=timeout,
+                sparse=sparse,
+            )
+            docs = parse_python_project(repo_dir)
+            note = f"Cloned to {repo_dir}. You may remove it after inspection."
+            if dest_dir:
+                note = f"Cloned to explicit destination {repo_dir}."
             return {
                 "status": "completed",
-                "mode": "local",
-                "target_dir": target_dir,
+                "mode": "cloned",
+                "target_dir": repo_dir,
                 "summary": _summarize(docs),
+                "note": note,
+            }
+
+        except FileExistsError as e:
+            return {"status": "error", "message": str(e), "repo_url": repo_url, "dest_dir": dest_dir}
+        except FileNotFoundError:
+            return {
+                "status": "error",
+                "message": "git not found. Please install Git and ensure it's in PATH.",
+                "repo_url": repo_url,
+            }
+        except subprocess.TimeoutExpired as e:
+            return {
+                "status": "error",
+                "message": f"git clone timeout after {e.timeout}s",
+                "repo_url": repo_url,
+            }
+        except subprocess.CalledProcessError as e:
+            return {
+                "status": "error",
+                "message": "git clone failed",
+                "repo_url": repo_url,
+                "returncode": e.returncode,
+                "stdout": e.stdout,
+                "stderr": e.stderr,
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"unexpected error: {type(e).__name__}: {e}",
+                "repo_url": repo_url,
+                "dest_dir": dest_dir,
             }
 
-        # Clone flow
-        wr = work_root
-        if wr:
-            wr = os.path.abspath(wr)
-        else:
-            wr = get_runtime_root(PROJECT_ROOT)
-
-        repo_dir = clone_repo(
-            repo_url,
-            work_root=wr,
-            dest_dir=dest_dir,
-            depth=depth,
-            timeout=timeout,
-        )
-        docs = parse_python_project(repo_dir)
-        note = f"Cloned to {repo_dir}. You may remove it after inspection."
-        if dest_dir:
-            note = f"Cloned to explicit destination {repo_dir}."
-        return {
-            "status": "completed",
-            "mode": "cloned",
-            "target_dir": repo_dir,
-            "summary": _summarize(docs),
-            "note": note,
-        }
-
-    except FileExistsError as e:
-        return {"status": "error", "message": str(e), "repo_url": repo_url, "dest_dir": dest_dir}
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": "git not found. Please install Git and ensure it's in PATH.",
-            "repo_url": repo_url,
-        }
-    except subprocess.TimeoutExpired as e:
-        return {
-            "status": "error",
-            "message": f"git clone timeout after {e.timeout}s",
-            "repo_url": repo_url,
-        }
-    except subprocess.CalledProcessError as e:
-        return {
-            "status": "error",
-            "message": "git clone failed",
-            "repo_url": repo_url,
-            "returncode": e.returncode,
-            "stdout": e.stdout,
-            "stderr": e.stderr,
-        }
-    except Exception as e:
-        return {
-            "status": "error",
-            "message": f"unexpected error: {type(e).__name__}: {e}",
-            "repo_url": repo_url,
-            "dest_dir": dest_dir,
-        }
+    return await asyncio.to_thread(_run)
 
 
 @mcp.tool()
-def generate_docstrings(
+async def generate_docstrings(
     local_path: Optional[str] = None,
     repo_url: Optional[str] = None,
     style: str = "google",
@@ -209,73 +251,80 @@ def generate_docstrings(
         "results": [ { module, path, class, function, lineno, signature, generated_docstring }, ... ]
       }
     """
-    try:
-        target_dir: Optional[str] = None
-        mode = "local"
 
-        if local_path and os.path.isdir(local_path):
-            target_dir = os.path.abspath(local_path)
+    def _run() -> Dict[str, Any]:
+        from app.services.documentation import generate_missing_docstrings
+        from app.services.repo import clone_repo
+
+        try:
+            target_dir: Optional[str] = None
             mode = "local"
-        elif repo_url:
-            wr = get_runtime_root(PROJECT_ROOT)
-            target_dir = clone_repo(repo_url, work_root=wr, depth=depth, timeout=timeout)
-            mode = "cloned"
-        else:
+
+            if local_path and os.path.isdir(local_path):
+                target_dir = os.path.abspath(local_path)
+                mode = "local"
+            elif repo_url:
+                wr = _runtime_root()
+                target_dir = clone_repo(repo_url, work_root=wr, depth=depth, timeout=timeout)
+                mode = "cloned"
+            else:
+                return {
+                    "status": "error",
+                    "message": "Provide either a valid local_path or repo_url.",
+                }
+
+            out = generate_missing_docstrings(
+                project_dir=target_dir,
+                style=style,
+                language=language,
+                max_items=max_items,
+                exclude_patterns=exclude_patterns,
+                skip_imports=skip_imports,
+                batch_size=batch_size,
+                single_file_timeout=single_file_timeout,
+                dry_run=dry_run,
+            )
+            return {
+                "status": "completed",
+                "mode": mode,
+                "target_dir": out["target_dir"],
+                "summary": out["summary"],
+                "results": out["results"],
+                "errors_detail_path": out.get("errors_detail_path"),
+            }
+
+        except FileNotFoundError:
+            return {
+                "status": "error",
+                "message": "git not found. Please install Git and ensure it's in PATH.",
+                "repo_url": repo_url,
+            }
+        except subprocess.TimeoutExpired as e:
+            return {
+                "status": "error",
+                "message": f"git clone timeout after {e.timeout}s",
+                "repo_url": repo_url,
+            }
+        except subprocess.CalledProcessError as e:
             return {
                 "status": "error",
-                "message": "Provide either a valid local_path or repo_url.",
+                "message": "git clone failed",
+                "repo_url": repo_url,
+                "returncode": e.returncode,
+                "stdout": e.stdout,
+                "stderr": e.stderr,
             }
+        except RuntimeError as e:
+            # Likely AIService configuration or HTTP error
+            return {"status": "error", "message": str(e)}
+        except Exception as e:
+            return {"status": "error", "message": f"unexpected error: {type(e).__name__}: {e}"}
 
-        out = generate_missing_docstrings(
-            project_dir=target_dir,
-            style=style,
-            language=language,
-            max_items=max_items,
-            exclude_patterns=exclude_patterns,
-            skip_imports=skip_imports,
-            batch_size=batch_size,
-            single_file_timeout=single_file_timeout,
-            dry_run=dry_run,
-        )
-        return {
-            "status": "completed",
-            "mode": mode,
-            "target_dir": out["target_dir"],
-            "summary": out["summary"],
-            "results": out["results"],
-            "errors_detail_path": out.get("errors_detail_path"),
-        }
-
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": "git not found. Please install Git and ensure it's in PATH.",
-            "repo_url": repo_url,
-        }
-    except subprocess.TimeoutExpired as e:
-        return {
-            "status": "error",
-            "message": f"git clone timeout after {e.timeout}s",
-            "repo_url": repo_url,
-        }
-    except subprocess.CalledProcessError as e:
-        return {
-            "status": "error",
-            "message": "git clone failed",
-            "repo_url": repo_url,
-            "returncode": e.returncode,
-            "stdout": e.stdout,
-            "stderr": e.stderr,
-        }
-    except RuntimeError as e:
-        # Likely AIService configuration or HTTP error
-        return {"status": "error", "message": str(e)}
-    except Exception as e:
-        return {"status": "error", "message": f"unexpected error: {type(e).__name__}: {e}"}
+    return await asyncio.to_thread(_run)
 
 
 @mcp.tool()
-def generate_static_site(
+async def generate_static_site(
     local_path: str,
     site_dir: Optional[str] = None,
     generator: str = "mkdocs",
@@ -292,31 +341,38 @@ def generate_static_site(
     Returns:
       { "status": "completed"|"error", "site_dir": "...", "generator_used": "mkdocs"|"pdoc", "errors_detail_path": "..." }
     """
-    try:
-        if not os.path.isdir(local_path):
-            return {"status": "error", "message": f"local_path not found or not a directory: {local_path}"}
-        if generator.lower() == "builtin":
-            return build_builtin_site(
+
+    def _run() -> Dict[str, Any]:
+        from app.services.site_builder import build_static_site
+        from app.services.site_builder_builtin import build_builtin_site
+
+        try:
+            if not os.path.isdir(local_path):
+                return {"status": "error", "message": f"local_path not found or not a directory: {local_path}"}
+            if generator.lower() == "builtin":
+                return build_builtin_site(
+                    project_dir=os.path.abspath(local_path),
+                    site_dir=site_dir,
+                    exclude_patterns=exclude_patterns,
+                    docformat=docformat,
+                    language=language,
+                )
+            out = build_static_site(
                 project_dir=os.path.abspath(local_path),
                 site_dir=site_dir,
+                generator=generator,
+                include_paths=include_paths,
                 exclude_patterns=exclude_patterns,
                 docformat=docformat,
                 language=language,
+                install_deps=install_deps,
+                timeout=timeout,
             )
-        out = build_static_site(
-            project_dir=os.path.abspath(local_path),
-            site_dir=site_dir,
-            generator=generator,
-            include_paths=include_paths,
-            exclude_patterns=exclude_patterns,
-            docformat=docformat,
-            language=language,
-            install_deps=install_deps,
-            timeout=timeout,
-        )
-        return out
-    except Exception as e:
-        return {"status": "error", "message": f"unexpected error: {type(e).__name__}: {e}"}
+            return out
+        except Exception as e:
+            return {"status": "error", "message": f"unexpected error: {type(e).__name__}: {e}"}
+
+    return await asyncio.to_thread(_run)
 
 
 if __name__ == "__main__":
@@ -324,4 +380,4 @@ if __name__ == "__main__":
     try:
         mcp.run(transport="sse")
     except TypeError:
-        mcp.run()
\ No newline at end of file
+        mcp.run()